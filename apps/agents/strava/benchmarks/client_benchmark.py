@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""HTTP benchmark for StravaClient against the local Strava simulator.
+
+Starts the simulator in-process with the requested latency and faults, then
+drives one pooled StravaClient from several threads with a mix of detail
+fetches, updates, stream fetches and activity-list pages. Reports
+throughput, per-endpoint latency percentiles, client errors, and the
+retries and 429s seen by the rate limiter.
+
+Usage:
+    python benchmarks/client_benchmark.py [--requests 500] [--concurrency 8]
+        [--latency lognormal --latency-ms 80] [--error-rate 0.02] [--json]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from agent_utils import percentile  # noqa: E402
+from clients.rate_limiter import RequestPriority, StravaRateLimiter  # noqa: E402
+from clients.strava_client import StravaClient  # noqa: E402
+from strava_simulator import SimulatorConfig, StravaSimulator  # noqa: E402
+
+# (operation, weight)
+OPERATION_MIX = [("get_activity", 6), ("update_activity", 2), ("get_streams", 1), ("list_activities", 1)]
+
+
+def run(args) -> dict:
+    config = SimulatorConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        short_limit=args.short_limit,
+        daily_limit=0,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        error_burst=args.error_burst,
+        slow_body_rate=args.slow_body_rate,
+        seed=args.seed,
+    )
+    # Once the simulated quota runs out, fail fast instead of waiting out the 15-minute window
+    rate_limiter = StravaRateLimiter(
+        short_limit=10**9, daily_limit=10**9, base_backoff=0.05, max_backoff=1.0,
+        max_wait={priority: args.max_wait for priority in RequestPriority},
+    )
+    rng = random.Random(args.seed)
+    operations = rng.choices([op for op, _ in OPERATION_MIX], [w for _, w in OPERATION_MIX], k=args.requests)
+    latencies = {op: [] for op, _ in OPERATION_MIX}
+    errors = {op: 0 for op, _ in OPERATION_MIX}
+    lock = threading.Lock()
+
+    with StravaSimulator(config) as simulator:
+        client = StravaClient("benchmark-token", base_url=simulator.base_url, pool_size=args.concurrency,
+                              rate_limiter=rate_limiter, timeout=(1.0, args.read_timeout))
+
+        def call(index_and_op):
+            index, op = index_and_op
+            activity_id = str(1000 + index % 50)
+            start = time.perf_counter()
+            try:
+                if op == "get_activity":
+                    client.get_activity_details(activity_id)
+                elif op == "update_activity":
+                    client.update_activity(activity_id, {"name": f"Benchmark {index}"})
+                elif op == "get_streams":
+                    client.get_activity_streams(activity_id)
+                else:
+                    client.list_athlete_activities(page=1 + index % 3, per_page=30)
+                failed = False
+            except Exception:
+                failed = True
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies[op].append(elapsed)
+                errors[op] += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(call, enumerate(operations)))
+        elapsed = time.perf_counter() - started
+        client.close()
+        served = dict(simulator.stats)
+
+    latencies = {op: sorted(samples) for op, samples in latencies.items()}
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "operations": {
+            op: {
+                "count": len(samples),
+                "errors": errors[op],
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "mean_ms": round(statistics.fmean(samples), 2),
+            }
+            for op, samples in latencies.items() if samples
+        },
+        "rate_limiter": rate_limiter.headroom(),
+        "simulator": served,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StravaClient over HTTP against the local simulator")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", choices=["none", "fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="relative spread: uniform half-width as a fraction of --latency-ms, or lognormal sigma")
+    parser.add_argument("--short-limit", type=int, default=0, help="simulated 15-minute limit (0 = unlimited)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-burst", type=int, default=3)
+    parser.add_argument("--slow-body-rate", type=float, default=0.0)
+    parser.add_argument("--read-timeout", type=float, default=5.0)
+    parser.add_argument("--max-wait", type=float, default=1.0, help="longest the client may wait for rate-limit quota")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['requests']} requests, {results['concurrency']} threads: "
+          f"{results['throughput_rps']} req/s over {results['elapsed_s']} s")
+    print(f"{'operation':<18}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for op, stats in results["operations"].items():
+        print(f"{op:<18}{stats['count']:>7}{stats['errors']:>8}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+    limiter = results["rate_limiter"]
+    print(f"retries: {limiter['retries']}, 429s: {limiter['rate_limited']}, simulator statuses: {results['simulator']['by_status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Scale benchmark for activity parsing and title generation on synthetic data.
+
+Generates seeded synthetic activities (or writes them as fixtures and reads
+them back through MockStravaClient's lazy index), then times eager and lazy
+parsing and title suggestions per activity. Use --laps, --segment-efforts
+and --route-points to stress the large nested payloads.
+
+Usage:
+    python benchmarks/scale_benchmark.py [--count 2000] [--laps 500]
+        [--segment-efforts 500] [--fixtures DIR] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from clients.strava_client import MockStravaClient  # noqa: E402
+from clients.synthetic_activities import SyntheticActivityGenerator  # noqa: E402
+from models.strava_models import parse_activity  # noqa: E402
+from services.title_engine import TitleEngine  # noqa: E402
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+        "per_second": round(1000 / statistics.fmean(ordered), 1) if statistics.fmean(ordered) else None,
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(args, fixtures_dir: Path) -> dict:
+    generator = SyntheticActivityGenerator(seed=args.seed)
+    options = {"laps": args.laps, "segment_efforts": args.segment_efforts, "route_points": args.route_points}
+
+    _, write_ms = timed(generator.write_fixtures, fixtures_dir, args.count, **options)
+    client, construct_ms = timed(MockStravaClient, fixtures_dir)
+    _, index_ms = timed(lambda: client.fixture_index)
+
+    samples = {"read": [], "parse_eager": [], "parse_lazy": [], "titles": []}
+    engine = TitleEngine(memo_size=0)
+    payload_bytes = 0
+    for activity_id in list(client.fixture_index)[:args.count]:
+        raw, ms = timed(client.fixture_index[activity_id].read_bytes)
+        samples["read"].append(ms)
+        payload_bytes += len(raw)
+        activity, ms = timed(parse_activity, raw)
+        samples["parse_eager"].append(ms)
+        _, ms = timed(parse_activity, raw, lazy=True)
+        samples["parse_lazy"].append(ms)
+        _, ms = timed(engine.suggest, activity.model_dump(), None, (), 3)
+        samples["titles"].append(ms)
+
+    return {
+        "activities": args.count,
+        "mean_payload_kb": round(payload_bytes / args.count / 1024, 1),
+        "write_fixtures_s": round(write_ms / 1000, 2),
+        "mock_construct_ms": round(construct_ms, 3),
+        "fixture_index_ms": round(index_ms, 2),
+        "operations": {name: summarize(values) for name, values in samples.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing and title generation on synthetic activities")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--laps", type=int, default=None, help="laps per activity (default: one per km or 5 km)")
+    parser.add_argument("--segment-efforts", type=int, default=0)
+    parser.add_argument("--route-points", type=int, default=None, help="polyline points (default: one per 25 m)")
+    parser.add_argument("--fixtures", type=Path, default=None, help="write fixtures here instead of a temp dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        results = run(args, args.fixtures)
+    else:
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            results = run(args, Path(fixtures_dir))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['activities']} activities, {results['mean_payload_kb']} KB each on average "
+          f"(written in {results['write_fixtures_s']} s)")
+    print(f"MockStravaClient construct: {results['mock_construct_ms']} ms, "
+          f"fixture index: {results['fixture_index_ms']} ms")
+    print(f"{'operation':<14}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'per s':>10}")
+    for name, stats in results["operations"].items():
+        print(f"{name:<14}{stats['mean_ms']:>10}{stats['p50_ms']:>10}{stats['p99_ms']:>10}{stats['per_second']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for the Strava agent container.
+
+Each measurement runs in a fresh interpreter so module caches don't hide
+import costs. Reports the import time of each heavy component, the full
+agent module import, the first new-activity request, and the first Bedrock
+agent build (no model call is made).
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# (component, setup statement run untimed, timed statement)
+MEASUREMENTS = [
+    ("agent_utils", "", "import agent_utils"),
+    ("pydantic_models", "", "import models.strava_models"),
+    ("strava_clients", "", "import clients"),
+    ("bedrock_agentcore", "", "import bedrock_agentcore"),
+    ("strands", "import bedrock_agentcore", "import strands"),
+    ("strava_agent_import", "", "import strava_agent"),
+    (
+        "first_new_activity_request",
+        "import strava_agent",
+        "strava_agent.invoke({'task': 'start_new_activity_flow', 'activityId': '1', 'sessionId': 'bench'})",
+    ),
+    ("first_agent_build", "import strava_agent", "strava_agent.build_agent()"),
+]
+
+TIMER_TEMPLATE = """
+import time, warnings
+warnings.simplefilter('ignore')
+{setup}
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(setup: str, statement: str) -> float:
+    """Time a statement in a fresh interpreter, returning milliseconds"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("STRAVA_CLIENT_MODE", "mock")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER_TEMPLATE.format(setup=setup, statement=statement)],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent cold-start time by component")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for component, setup, statement in MEASUREMENTS:
+        samples = [measure(setup, statement) for _ in range(args.runs)]
+        results[component] = {
+            "median_ms": round(statistics.median(samples), 1),
+            "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'component':<28}{'median':>10}{'min':>10}{'max':>10}")
+    for component, stats in results.items():
+        print(f"{component:<28}{stats['median_ms']:>10}{stats['min_ms']:>10}{stats['max_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
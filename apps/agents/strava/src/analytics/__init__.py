@@ -0,0 +1,27 @@
+# Analytics package
+from .polyline import RouteFeatures, decode_polyline, encode_polyline, route_features
+from .streams import (
+    STREAM_KEYS,
+    ActivityStreams,
+    best_efforts,
+    best_average,
+    hr_zone_time,
+    split_analysis,
+    summarize_streams,
+    synthetic_streams
+)
+
+__all__ = [
+    "RouteFeatures",
+    "decode_polyline",
+    "encode_polyline",
+    "route_features",
+    "STREAM_KEYS",
+    "ActivityStreams",
+    "best_efforts",
+    "best_average",
+    "hr_zone_time",
+    "split_analysis",
+    "summarize_streams",
+    "synthetic_streams"
+]
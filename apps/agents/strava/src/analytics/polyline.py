@@ -0,0 +1,163 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+# A route whose ends are this close (absolute, or relative to its length) counts as closed
+CLOSED_ROUTE_MIN_M = 200.0
+CLOSED_ROUTE_RATIO = 0.05
+
+# Isoperimetric ratio 4*pi*area/perimeter^2 below which a closed route is out-and-back
+OUT_AND_BACK_MAX_COMPACTNESS = 0.03
+
+# Grades are measured over at least this much distance to smooth GPS/altitude noise
+GRADE_WINDOW_M = 100.0
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> np.ndarray:
+    """Decode a Google-encoded polyline into an (n, 2) array of [lat, lng].
+
+    Works on the whole string at once: each character's 5-bit payload is
+    shifted by its position within its varint, varints are summed with
+    np.add.reduceat, zigzag-decoded, and the deltas are cumulatively summed.
+    """
+    if not encoded:
+        return np.empty((0, 2), dtype=np.float64)
+    
+    values = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    is_last = (values & 0x20) == 0
+    
+    # Drop a trailing unterminated varint from a truncated string
+    last_end = np.flatnonzero(is_last)
+    if last_end.size == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    values = values[: last_end[-1] + 1]
+    is_last = is_last[: last_end[-1] + 1]
+    
+    ends = np.flatnonzero(is_last)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.concatenate(([0], np.cumsum(is_last[:-1])))
+    position = np.arange(values.size) - starts[group]
+    
+    raw = np.add.reduceat((values & 0x1F) << (5 * position), starts)
+    deltas = np.where(raw & 1, ~(raw >> 1), raw >> 1)
+    
+    if deltas.size % 2:
+        deltas = deltas[:-1]
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 10 ** precision
+
+
+def encode_polyline(coords: np.ndarray, precision: int = 5) -> str:
+    """Encode an (n, 2) array of [lat, lng] as a Google polyline string"""
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.size == 0:
+        return ""
+    
+    scaled = np.round(coords * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    
+    # Split every value into up to seven 5-bit chunks, least significant first
+    shifts = 5 * np.arange(7)
+    chunks = (zigzag[:, None] >> shifts) & 0x1F
+    n_chunks = np.maximum(1, (np.floor(np.log2(np.maximum(zigzag, 1))).astype(np.int64) // 5) + 1)
+    used = np.arange(7) < n_chunks[:, None]
+    continuation = np.arange(7) < (n_chunks - 1)[:, None]
+    
+    encoded = (chunks | (continuation * 0x20)) + 63
+    return encoded[used].astype(np.uint8).tobytes().decode("ascii")
+
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    """Project [lat, lng] degrees to local equirectangular metres"""
+    lat = np.radians(coords[:, 0])
+    lng = np.radians(coords[:, 1])
+    x = (lng - lng[0]) * np.cos(lat.mean()) * EARTH_RADIUS_M
+    y = (lat - lat[0]) * EARTH_RADIUS_M
+    return np.column_stack((x, y))
+
+
+def haversine_segments(coords: np.ndarray) -> np.ndarray:
+    """Great-circle length in metres of each consecutive segment"""
+    lat = np.radians(coords[:, 0])
+    lng = np.radians(coords[:, 1])
+    dlat = np.diff(lat)
+    dlng = np.diff(lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@dataclass
+class RouteFeatures:
+    """Shape and geometry features of a route"""
+    points: int
+    distance_m: float
+    shape: str  # loop, out_and_back, point_to_point
+    bounding_box: Tuple[float, float, float, float]  # min_lat, min_lng, max_lat, max_lng
+    start_end_distance_m: float
+    total_turning_deg: float
+    max_grade_pct: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _max_grade(cumulative: np.ndarray, altitude: np.ndarray) -> Optional[float]:
+    """Steepest grade between each point and the first point GRADE_WINDOW_M ahead of it"""
+    ahead = np.searchsorted(cumulative, cumulative + GRADE_WINDOW_M)
+    valid = ahead < cumulative.size
+    if not valid.any():
+        return None
+    start = np.flatnonzero(valid)
+    end = ahead[valid]
+    grades = (altitude[end] - altitude[start]) / (cumulative[end] - cumulative[start])
+    return round(float(grades.max()) * 100, 1)
+
+
+def route_features(coords: np.ndarray, altitude: Optional[np.ndarray] = None) -> Optional[RouteFeatures]:
+    """Compute route features from decoded coordinates without per-point Python loops.
+
+    `altitude` (metres, one value per coordinate) enables max_grade_pct; encoded
+    polylines carry no elevation, so it comes from activity streams when available.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.shape[0] < 2:
+        return None
+    
+    segments = haversine_segments(coords)
+    cumulative = np.concatenate(([0.0], np.cumsum(segments)))
+    distance = float(cumulative[-1])
+    start_end = float(haversine_segments(coords[[0, -1]])[0])
+    
+    xy = _project(coords)
+    steps = np.diff(xy, axis=0)
+    moving = np.hypot(steps[:, 0], steps[:, 1]) > 0
+    headings = np.arctan2(steps[moving, 1], steps[moving, 0])
+    turns = (np.diff(headings) + np.pi) % (2 * np.pi) - np.pi
+    total_turning = float(np.degrees(np.abs(turns).sum()))
+    
+    if start_end > max(CLOSED_ROUTE_MIN_M, CLOSED_ROUTE_RATIO * distance):
+        shape = "point_to_point"
+    else:
+        # Shoelace area of the (closed) track relative to a circle of the same perimeter
+        x, y = xy[:, 0], xy[:, 1]
+        area = 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+        perimeter = distance + start_end
+        compactness = 4 * np.pi * area / perimeter ** 2 if perimeter else 0.0
+        shape = "loop" if compactness > OUT_AND_BACK_MAX_COMPACTNESS else "out_and_back"
+    
+    max_grade = None
+    if altitude is not None and len(altitude) == coords.shape[0]:
+        max_grade = _max_grade(cumulative, np.asarray(altitude, dtype=np.float64))
+    
+    return RouteFeatures(
+        points=int(coords.shape[0]),
+        distance_m=round(distance, 1),
+        shape=shape,
+        bounding_box=tuple(round(float(v), 5) for v in (*coords.min(axis=0), *coords.max(axis=0))),
+        start_end_distance_m=round(start_end, 1),
+        total_turning_deg=round(total_turning, 1),
+        max_grade_pct=max_grade,
+    )
@@ -0,0 +1,190 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+STREAM_KEYS = ("time", "distance", "heartrate", "altitude", "cadence")
+
+# Compact storage dtypes; computations upcast as needed
+STREAM_DTYPES = {
+    "time": np.int32,
+    "distance": np.float32,
+    "heartrate": np.int16,
+    "altitude": np.float32,
+    "cadence": np.int16,
+}
+
+BEST_EFFORT_DISTANCES_M = (400.0, 1000.0, 1609.344, 5000.0, 10000.0)
+
+# Upper bounds of HR zones 1-4 as a fraction of max HR; zone 5 is everything above
+HR_ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)
+
+# Sampling gaps longer than this (auto-pause) don't count towards zone time
+MAX_SAMPLE_GAP_S = 10
+
+# Matches one key_by_type stream object and captures its numeric data array
+_STREAM_DATA_RE = re.compile(rb'"(\w+)"\s*:\s*\{[^{}]*?"data"\s*:\s*\[([^\]]*)\]')
+
+
+@dataclass
+class ActivityStreams:
+    """Per-sample activity streams held as compact NumPy arrays"""
+    time: np.ndarray
+    distance: Optional[np.ndarray] = None
+    heartrate: Optional[np.ndarray] = None
+    altitude: Optional[np.ndarray] = None
+    cadence: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return int(self.time.size)
+    
+    @classmethod
+    def from_arrays(cls, streams: Dict[str, Iterable[float]]) -> "ActivityStreams":
+        """Build from a mapping of stream type to samples"""
+        arrays = {
+            key: np.asarray(values, dtype=STREAM_DTYPES[key])
+            for key, values in streams.items()
+            if key in STREAM_DTYPES and values is not None
+        }
+        if "time" not in arrays:
+            raise ValueError("Activity streams must include a time stream")
+        return cls(**arrays)
+    
+    @classmethod
+    def from_response(cls, payload: Union[bytes, Dict[str, Any]]) -> "ActivityStreams":
+        """Parse a key_by_type=true streams response.
+
+        Raw bytes are scanned for each stream's data array and converted with
+        np.fromstring, so no per-sample Python objects are created.
+        """
+        if isinstance(payload, (bytes, bytearray)):
+            arrays = {}
+            for match in _STREAM_DATA_RE.finditer(payload):
+                key = match.group(1).decode("ascii")
+                if key in STREAM_DTYPES:
+                    values = np.fromstring(match.group(2).decode("ascii"), sep=",") if match.group(2).strip() else []
+                    arrays[key] = values
+            return cls.from_arrays(arrays)
+        return cls.from_arrays({key: stream.get("data") for key, stream in payload.items()})
+
+
+def best_efforts(
+    distance: np.ndarray, time: np.ndarray, targets: Iterable[float] = BEST_EFFORT_DISTANCES_M
+) -> Dict[str, Dict[str, float]]:
+    """Fastest time to cover each target distance, over every start sample.
+
+    A two-pointer sliding window per target: the end sample only moves
+    forward along the monotonic distance stream, so each target is one
+    O(n) pass.
+    """
+    distance_m = distance.astype(np.float64).tolist()
+    time_s = time.astype(np.float64).tolist()
+    n = len(distance_m)
+    efforts: Dict[str, Dict[str, float]] = {}
+    for target in targets:
+        best: Optional[Tuple[float, float]] = None
+        end = 0
+        for start in range(n):
+            # First sample at least `target` metres past the start
+            goal = distance_m[start] + target
+            while end < n and distance_m[end] < goal:
+                end += 1
+            if end == n:
+                break
+            elapsed = time_s[end] - time_s[start]
+            if best is None or elapsed < best[0]:
+                best = (elapsed, time_s[start])
+        if best is not None:
+            efforts[f"{target:g}m"] = {"time_s": best[0], "start_s": best[1]}
+    return efforts
+
+
+def best_average(values: np.ndarray, time: np.ndarray, window_s: int) -> Optional[float]:
+    """Highest mean of a stream over any `window_s` window, in O(n) via a 1 Hz cumulative sum"""
+    if time.size < 2 or time[-1] - time[0] < window_s:
+        return None
+    grid = np.arange(time[0], time[-1] + 1)
+    resampled = np.interp(grid, time.astype(np.float64), values.astype(np.float64))
+    cumulative = np.concatenate(([0.0], np.cumsum(resampled)))
+    window_sums = cumulative[window_s:] - cumulative[:-window_s]
+    return round(float(window_sums.max() / window_s), 1)
+
+
+def hr_zone_time(heartrate: np.ndarray, time: np.ndarray, max_hr: float) -> Dict[str, int]:
+    """Seconds spent in each heart-rate zone, weighting samples by their duration"""
+    durations = np.diff(time.astype(np.int64))
+    durations = np.where(durations > MAX_SAMPLE_GAP_S, 0, durations)
+    zones = np.digitize(heartrate[:-1], np.asarray(HR_ZONE_BOUNDS) * max_hr)
+    seconds = np.bincount(zones, weights=durations, minlength=len(HR_ZONE_BOUNDS) + 1)
+    return {f"z{zone + 1}": int(value) for zone, value in enumerate(seconds)}
+
+
+def split_analysis(distance: np.ndarray, time: np.ndarray, split_m: float = 1000.0) -> Optional[Dict[str, Any]]:
+    """Per-split times, fastest/slowest split, trend and negative-split detection"""
+    distance = distance.astype(np.float64)
+    time = time.astype(np.float64)
+    total = distance[-1] if distance.size else 0.0
+    if total < 2 * split_m:
+        return None
+    
+    # Interpolated elapsed time at every split boundary
+    boundaries = np.arange(0.0, total + 1e-9, split_m)
+    at_boundary = np.interp(boundaries, distance, time)
+    split_times = np.diff(at_boundary)
+    
+    halfway = np.interp(total / 2, distance, time)
+    first_half = halfway - time[0]
+    second_half = time[-1] - halfway
+    
+    # Least-squares slope of split time against split number (seconds per split)
+    trend = float(np.polyfit(np.arange(split_times.size), split_times, 1)[0])
+    
+    return {
+        "split_m": split_m,
+        "split_times_s": [round(float(t), 1) for t in split_times],
+        "fastest_split": int(np.argmin(split_times)) + 1,
+        "slowest_split": int(np.argmax(split_times)) + 1,
+        "trend_s_per_split": round(trend, 2),
+        "negative_split": bool(second_half < first_half),
+    }
+
+
+def summarize_streams(streams: ActivityStreams, max_hr: Optional[float] = None) -> Dict[str, Any]:
+    """Compact analytics summary suitable for title generation and the LLM"""
+    summary: Dict[str, Any] = {"samples": len(streams)}
+    if streams.distance is not None and streams.distance.size == streams.time.size:
+        summary["best_efforts"] = best_efforts(streams.distance, streams.time)
+        splits = split_analysis(streams.distance, streams.time)
+        if splits is not None:
+            summary["splits"] = splits
+    if streams.heartrate is not None and streams.heartrate.size == streams.time.size:
+        summary["best_20min_heartrate"] = best_average(streams.heartrate, streams.time, 20 * 60)
+        summary["hr_zones_s"] = hr_zone_time(
+            streams.heartrate, streams.time, max_hr or float(streams.heartrate.max())
+        )
+    if streams.altitude is not None and streams.altitude.size == streams.time.size:
+        gain = np.diff(streams.altitude.astype(np.float64))
+        summary["elevation_gain_m"] = round(float(gain[gain > 0].sum()), 1)
+    return summary
+
+
+def synthetic_streams(
+    moving_time: int, distance_m: float, average_heartrate: Optional[float] = None, seed: int = 0
+) -> ActivityStreams:
+    """Plausible 1 Hz streams for an activity, for mocks and benchmarks"""
+    rng = np.random.default_rng(seed)
+    n = max(int(moving_time), 2)
+    time = np.arange(n, dtype=np.int32)
+    
+    speed = np.clip(1 + 0.15 * rng.standard_normal(n).cumsum() / np.sqrt(n), 0.2, None)
+    distance = np.cumsum(speed)
+    distance *= distance_m / distance[-1]
+    
+    altitude = 50 + np.cumsum(rng.normal(0, 0.3, n))
+    cadence = np.clip(rng.normal(170, 5, n), 0, None)
+    streams = {"time": time, "distance": distance, "altitude": altitude, "cadence": cadence}
+    if average_heartrate:
+        drift = np.linspace(-8, 8, n)
+        streams["heartrate"] = np.clip(average_heartrate + drift + rng.normal(0, 3, n), 60, 220)
+    return ActivityStreams.from_arrays(streams)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Bulk historical backfill of an athlete's Strava activities.
+
+Pages GET /athlete/activities from newest to oldest, fetches full details
+concurrently on the asyncio client's connection pool, and writes each page as it completes to JSON
+Lines or the SQLite activity store. Progress is checkpointed after every
+page so an interrupted run resumes where it stopped; activities whose
+details failed to fetch are kept in the checkpoint and retried once the
+listing is exhausted (and again on any later run).
+
+Usage:
+    python backfill.py --out history.jsonl [--concurrency 4] [--per-page 50]
+    python backfill.py --out history.db --max-activities 500
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from clients.strava_client import StravaClientInterface, StravaClient, MockStravaClient
+from clients.async_strava_client import AsyncStravaClientInterface, AsyncStravaClient, AsyncMockStravaClient
+from clients.rate_limiter import RequestPriority, default_rate_limiter
+from models.strava_models import StravaActivityBase
+from storage.activity_store import ActivityStore
+from agent_utils import initialize_env
+
+logger = logging.getLogger("backfill")
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Resumable backfill position: everything at or older than `before` is still to do"""
+    before: Optional[int] = None
+    # Ids already written at the `before` timestamp, skipped when the next page repeats them
+    boundary_ids: List[int] = field(default_factory=list)
+    activities_written: int = 0
+    failed_ids: List[int] = field(default_factory=list)
+    finished: bool = False
+    
+    @classmethod
+    def load(cls, path: Path) -> "BackfillCheckpoint":
+        if path.exists():
+            return cls(**json.loads(path.read_text()))
+        return cls()
+    
+    def save(self, path: Path):
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self)))
+        os.replace(tmp_path, path)
+
+
+class BackfillSink(ABC):
+    """Destination for backfilled activities"""
+    
+    @abstractmethod
+    def write(self, activities: Iterable[StravaActivityBase]) -> int:
+        """Persist activities, skipping ones already written; returns the number written"""
+        pass
+    
+    def close(self):
+        pass
+
+
+class JsonLinesSink(BackfillSink):
+    """Appends one activity JSON document per line"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._seen: Set[int] = set()
+        if path.exists():
+            # A resumed run may repeat the page that was in flight; don't duplicate it
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self._seen.add(json.loads(line)["id"])
+        self._file = open(path, "a")
+    
+    def write(self, activities: Iterable[StravaActivityBase]) -> int:
+        written = 0
+        for activity in activities:
+            if activity.id in self._seen:
+                continue
+            self._file.write(activity.model_dump_json(by_alias=True) + "\n")
+            self._seen.add(activity.id)
+            written += 1
+        self._file.flush()
+        return written
+    
+    def close(self):
+        self._file.close()
+
+
+class ActivityStoreSink(BackfillSink):
+    """Upserts into the SQLite activity store used by the agent's history tools"""
+    
+    def __init__(self, store: ActivityStore):
+        self.store = store
+    
+    def write(self, activities: Iterable[StravaActivityBase]) -> int:
+        return self.store.upsert_many(activities)
+    
+    def close(self):
+        self.store.close()
+
+
+class Backfill:
+    """Streams an athlete's history from Strava into a sink with checkpointing.
+    
+    With an async client, each page's details are fetched concurrently on
+    one event loop (and the client is closed when the run ends); otherwise
+    the sync client's detail calls run on a thread pool.
+    """
+    
+    def __init__(
+        self,
+        client: StravaClientInterface,
+        sink: BackfillSink,
+        checkpoint_path: Path,
+        concurrency: int = 4,
+        per_page: int = 50,
+        fetch_details: bool = True,
+        async_client: Optional[AsyncStravaClientInterface] = None,
+    ):
+        self.client = client
+        self.async_client = async_client
+        self.sink = sink
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.per_page = per_page
+        self.fetch_details = fetch_details
+        self.checkpoint = BackfillCheckpoint.load(checkpoint_path)
+    
+    def _fetch_details(self, activity_id: int) -> Optional[StravaActivityBase]:
+        # Worker threads don't inherit the caller's context, so set priority here
+        with default_rate_limiter.priority(RequestPriority.BACKGROUND):
+            try:
+                return self.client.get_activity_details(str(activity_id))
+            except Exception as e:
+                logger.warning("Failed to fetch activity %s: %s", activity_id, e)
+                return None
+    
+    async def _fetch_details_async(self, activity_ids: List[int]) -> List[Optional[StravaActivityBase]]:
+        with default_rate_limiter.priority(RequestPriority.BACKGROUND):
+            results = await self.async_client.get_activities_details(
+                [str(activity_id) for activity_id in activity_ids],
+                max_concurrency=self.concurrency,
+                return_exceptions=True,
+            )
+        for activity_id, result in zip(activity_ids, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to fetch activity %s: %s", activity_id, result)
+        return [None if isinstance(result, Exception) else result for result in results]
+    
+    def _fetch_many(self, executor: ThreadPoolExecutor, activity_ids: List[int]) -> List[Optional[StravaActivityBase]]:
+        """Full details in the order requested, None where the fetch failed"""
+        if self.async_client is not None:
+            return self._runner.run(self._fetch_details_async(activity_ids))
+        return list(executor.map(self._fetch_details, activity_ids))
+    
+    def _fetch_page(self, executor: ThreadPoolExecutor, page: List[StravaActivityBase]) -> List[StravaActivityBase]:
+        """Full details for a page; ids that fail are recorded in the checkpoint for a later retry"""
+        activities = []
+        for summary, activity in zip(page, self._fetch_many(executor, [a.id for a in page])):
+            if activity is None:
+                if summary.id not in self.checkpoint.failed_ids:
+                    self.checkpoint.failed_ids.append(summary.id)
+            else:
+                activities.append(activity)
+        return activities
+    
+    def retry_failed(self, executor: ThreadPoolExecutor) -> int:
+        """Fetch ids that failed on an earlier page (or run) again; returns the number written"""
+        if not self.checkpoint.failed_ids:
+            return 0
+        failed = list(self.checkpoint.failed_ids)
+        activities = [a for a in self._fetch_many(executor, failed) if a is not None]
+        recovered = {a.id for a in activities}
+        written = self.sink.write(activities)
+        self.checkpoint.failed_ids = [i for i in failed if i not in recovered]
+        self.checkpoint.activities_written += written
+        self.checkpoint.save(self.checkpoint_path)
+        logger.info("Retried %s failed activities, %s still failing", len(failed), len(self.checkpoint.failed_ids))
+        return written
+    
+    def _advance(self, page: List[StravaActivityBase]):
+        """Move the cursor to the oldest start time on the page, remembering the ids written there.
+        
+        Strava's `before` is exclusive, so the next page is requested from one
+        second past the oldest start; activities sharing that timestamp across
+        the page boundary are then listed again and de-duplicated by id.
+        """
+        oldest = min(int(a.start_date.timestamp()) for a in page)
+        at_oldest = [a.id for a in page if int(a.start_date.timestamp()) == oldest]
+        if self.checkpoint.before == oldest + 1:
+            self.checkpoint.boundary_ids = sorted(set(self.checkpoint.boundary_ids) | set(at_oldest))
+        else:
+            self.checkpoint.before = oldest + 1
+            self.checkpoint.boundary_ids = at_oldest
+    
+    def run(self, max_activities: Optional[int] = None) -> float:
+        """Backfill until history is exhausted or max_activities is reached; returns activities/sec"""
+        with asyncio.Runner() as runner, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            self._runner = runner
+            try:
+                return self._run(executor, max_activities)
+            finally:
+                if self.async_client is not None:
+                    runner.run(self.async_client.aclose())
+    
+    def _run(self, executor: ThreadPoolExecutor, max_activities: Optional[int]) -> float:
+        started = time.perf_counter()
+        written_this_run = 0
+        
+        if self.checkpoint.finished:
+            logger.info("Backfill already finished (%s activities)", self.checkpoint.activities_written)
+        
+        while not self.checkpoint.finished and (max_activities is None or written_this_run < max_activities):
+            with default_rate_limiter.priority(RequestPriority.BACKGROUND):
+                listed = self.client.list_athlete_activities(before=self.checkpoint.before, per_page=self.per_page)
+            boundary = set(self.checkpoint.boundary_ids)
+            page = [a for a in listed if a.id not in boundary]
+            if not page:
+                if len(listed) < self.per_page:
+                    self.checkpoint.finished = True
+                else:
+                    # A full page of activities at one timestamp; step past it rather than loop
+                    self.checkpoint.before -= 1
+                    self.checkpoint.boundary_ids = []
+                self.checkpoint.save(self.checkpoint_path)
+                continue
+            
+            activities = self._fetch_page(executor, page) if self.fetch_details else page
+            
+            written = self.sink.write(activities)
+            written_this_run += written
+            self.checkpoint.activities_written += written
+            self._advance(page)
+            self.checkpoint.save(self.checkpoint_path)
+            
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Wrote %s activities (%s total), %.1f activities/sec",
+                written, self.checkpoint.activities_written, written_this_run / elapsed if elapsed else 0.0,
+            )
+            
+            if len(listed) < self.per_page:
+                self.checkpoint.finished = True
+                self.checkpoint.save(self.checkpoint_path)
+        
+        if self.checkpoint.finished and self.fetch_details:
+            written_this_run += self.retry_failed(executor)
+        
+        elapsed = time.perf_counter() - started
+        return written_this_run / elapsed if elapsed else 0.0
+
+
+def create_sink(out: Path) -> BackfillSink:
+    if out.suffix in (".db", ".sqlite", ".sqlite3"):
+        return ActivityStoreSink(ActivityStore(str(out)))
+    return JsonLinesSink(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill an athlete's Strava history")
+    parser.add_argument("--out", required=True, type=Path, help="output .jsonl file or .db SQLite activity store")
+    parser.add_argument("--checkpoint", type=Path, help="checkpoint file (default: <out>.checkpoint.json)")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent detail fetches")
+    parser.add_argument("--per-page", type=int, default=50, help="activities per list page")
+    parser.add_argument("--max-activities", type=int, help="stop after writing this many activities")
+    parser.add_argument("--summary-only", action="store_true", help="store list summaries without fetching details")
+    args = parser.parse_args()
+    
+    initialize_env()
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+    
+    if os.getenv('STRAVA_CLIENT_MODE', 'mock') == 'mock':
+        client: StravaClientInterface = MockStravaClient()
+        async_client: AsyncStravaClientInterface = AsyncMockStravaClient(client)
+    else:
+        client = StravaClient(os.getenv('STRAVA_ACCESS_TOKEN', ''), pool_size=1)
+        async_client = AsyncStravaClient(os.getenv('STRAVA_ACCESS_TOKEN', ''), pool_size=args.concurrency)
+    
+    sink = create_sink(args.out)
+    backfill = Backfill(
+        client,
+        sink,
+        checkpoint_path=args.checkpoint or args.out.with_name(args.out.name + ".checkpoint.json"),
+        concurrency=args.concurrency,
+        per_page=args.per_page,
+        fetch_details=not args.summary_only,
+        async_client=async_client,
+    )
+    try:
+        throughput = backfill.run(max_activities=args.max_activities)
+    finally:
+        sink.close()
+    
+    print(json.dumps({
+        "activities_written": backfill.checkpoint.activities_written,
+        "failed": len(backfill.checkpoint.failed_ids),
+        "finished": backfill.checkpoint.finished,
+        "activities_per_sec": round(throughput, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
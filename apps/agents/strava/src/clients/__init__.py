@@ -1,4 +1,43 @@
 # Clients package
 from .strava_client import StravaClientInterface, StravaClient, MockStravaClient
+from .rate_limiter import RequestPriority, StravaRateLimiter, StravaRateLimitError, default_rate_limiter
+from .client_registry import StravaClientRegistry
+from .cached_client import ActivityCache, CachedStravaClient
+from .mutation_buffer import ActivityMutationBuffer, MutationFlushResult, PRIVACY_TO_VISIBILITY
 
-__all__ = ["StravaClientInterface", "StravaClient", "MockStravaClient"]
+# The async clients pull in httpx and the synthetic generator numpy, so they are only imported on first use
+_ASYNC_EXPORTS = {"AsyncStravaClientInterface", "AsyncStravaClient", "AsyncMockStravaClient"}
+_SYNTHETIC_EXPORTS = {"SportProfile", "SPORT_PROFILES", "SyntheticActivityGenerator"}
+
+
+def __getattr__(name):
+    if name in _ASYNC_EXPORTS:
+        from . import async_strava_client
+        return getattr(async_strava_client, name)
+    if name in _SYNTHETIC_EXPORTS:
+        from . import synthetic_activities
+        return getattr(synthetic_activities, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "StravaClientInterface",
+    "StravaClient",
+    "MockStravaClient",
+    "StravaClientRegistry",
+    "RequestPriority",
+    "StravaRateLimiter",
+    "StravaRateLimitError",
+    "default_rate_limiter",
+    "ActivityCache",
+    "CachedStravaClient",
+    "ActivityMutationBuffer",
+    "MutationFlushResult",
+    "PRIVACY_TO_VISIBILITY",
+    "AsyncStravaClientInterface",
+    "AsyncStravaClient",
+    "AsyncMockStravaClient",
+    "SportProfile",
+    "SPORT_PROFILES",
+    "SyntheticActivityGenerator"
+]
@@ -0,0 +1,156 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import httpx
+
+from models.strava_models import StravaActivity, parse_activity
+from .strava_client import MockStravaClient
+from .rate_limiter import StravaRateLimiter, StravaRateLimitError, default_rate_limiter
+from telemetry import endpoint_template, telemetry
+
+
+class AsyncStravaClientInterface(ABC):
+    """Abstract asyncio interface for Strava API interactions"""
+    
+    @abstractmethod
+    async def get_activity_details(self, activity_id: str) -> StravaActivity:
+        """Retrieve detailed information about a specific activity"""
+        pass
+    
+    @abstractmethod
+    async def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Apply field changes to an activity in one write and return the updated activity"""
+        pass
+    
+    async def get_activities_details(
+        self, activity_ids: Sequence[str], max_concurrency: int = 5, return_exceptions: bool = False
+    ) -> List[Union[StravaActivity, BaseException]]:
+        """Fetch many activities concurrently, returning them in the order requested.
+        
+        With `return_exceptions`, a failed fetch is returned in its activity's
+        place instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(activity_id: str) -> StravaActivity:
+            async with semaphore:
+                return await self.get_activity_details(activity_id)
+        
+        return list(await asyncio.gather(
+            *(fetch(activity_id) for activity_id in activity_ids), return_exceptions=return_exceptions
+        ))
+    
+    async def aclose(self):
+        """Release any underlying connections"""
+        pass
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+class AsyncStravaClient(AsyncStravaClientInterface):
+    """Production asyncio Strava API client backed by a shared httpx connection pool"""
+    
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = "https://www.strava.com/api/v3",
+        pool_size: int = 10,
+        timeout: float = 10.0,
+        rate_limiter: Optional[StravaRateLimiter] = None,
+        lazy_parsing: bool = False,
+    ):
+        self.access_token = access_token
+        self.base_url = base_url
+        self.lazy_parsing = lazy_parsing
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                'Authorization': f'Bearer {access_token}',
+                'Content-Type': 'application/json'
+            },
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+        )
+    
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the shared rate limiter, retrying 429s, 5xx and timeouts with backoff"""
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            with telemetry.span("strava_http", method=method, endpoint=endpoint_template(path)) as span:
+                try:
+                    response = await self.http.request(method, path, **kwargs)
+                except httpx.TransportError as e:
+                    # Includes httpx.TimeoutException, the counterpart of requests' ConnectionError and Timeout
+                    span.set(status=type(e).__name__)
+                    if attempt < self.rate_limiter.max_retries:
+                        await asyncio.sleep(self.rate_limiter.backoff_delay(attempt))
+                        continue
+                    raise
+                span.set(status=response.status_code)
+            self.rate_limiter.update_from_headers(response.headers)
+            
+            if response.status_code == 429 or response.status_code >= 500:
+                if response.status_code == 429:
+                    self.rate_limiter.record_rate_limited()
+                if attempt < self.rate_limiter.max_retries:
+                    await asyncio.sleep(self.rate_limiter.backoff_delay(attempt, response.headers.get('Retry-After')))
+                    continue
+                if response.status_code == 429:
+                    raise StravaRateLimitError(f"Strava rate limit exceeded for {method} {path}")
+            
+            response.raise_for_status()
+            return response
+    
+    async def get_activity_details(self, activity_id: str) -> StravaActivity:
+        """Fetch activity details from Strava API"""
+        try:
+            response = await self._request('GET', f"/activities/{activity_id}", params={'include_all_efforts': 'false'})
+            
+            with telemetry.span("strava_parse", model="activity"):
+                return parse_activity(response.content, lazy=self.lazy_parsing)
+            
+        except StravaRateLimitError:
+            raise
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to fetch activity {activity_id} from Strava API: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to parse activity {activity_id} data: {str(e)}")
+    
+    async def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Update an activity with a single PUT /activities/{id}"""
+        try:
+            response = await self._request('PUT', f"/activities/{activity_id}", json=updates)
+            with telemetry.span("strava_parse", model="activity"):
+                return parse_activity(response.content, lazy=self.lazy_parsing)
+            
+        except StravaRateLimitError:
+            raise
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to update activity {activity_id} on Strava API: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to parse updated activity {activity_id} data: {str(e)}")
+    
+    async def aclose(self):
+        """Close the pooled connections"""
+        await self.http.aclose()
+
+
+class AsyncMockStravaClient(AsyncStravaClientInterface):
+    """Asyncio adapter over MockStravaClient for testing and development"""
+    
+    def __init__(self, client: Optional[MockStravaClient] = None):
+        self.client = client or MockStravaClient()
+    
+    async def get_activity_details(self, activity_id: str) -> StravaActivity:
+        """Return mock activity data"""
+        return self.client.get_activity_details(activity_id)
+    
+    async def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Apply updates to the mock activity"""
+        return self.client.update_activity(activity_id, updates)
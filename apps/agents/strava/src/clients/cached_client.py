@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from models.strava_models import StravaActivity
+from .strava_client import StravaClientInterface
+
+
+class ActivityCache:
+    """Thread-safe LRU cache of activities with a per-entry TTL"""
+    
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, StravaActivity]]" = OrderedDict()
+    
+    def get(self, activity_id: str) -> Optional[StravaActivity]:
+        """Return a fresh cached activity, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(activity_id)
+            if entry is not None:
+                expires_at, activity = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(activity_id)
+                    self.hits += 1
+                    return activity
+                del self._entries[activity_id]
+            self.misses += 1
+            return None
+    
+    def put(self, activity_id: str, activity: StravaActivity):
+        """Store an activity, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[activity_id] = (time.monotonic() + self.ttl_seconds, activity)
+            self._entries.move_to_end(activity_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, activity_id: str) -> bool:
+        """Drop a single activity; returns True if it was cached"""
+        with self._lock:
+            return self._entries.pop(activity_id, None) is not None
+    
+    def clear(self):
+        """Drop every entry and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for logging and metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class CachedStravaClient(StravaClientInterface):
+    """Caching decorator around any StravaClientInterface implementation"""
+    
+    def __init__(
+        self,
+        client: StravaClientInterface,
+        cache: Optional[ActivityCache] = None,
+        max_size: int = 256,
+        ttl_seconds: float = 300.0,
+    ):
+        self.client = client
+        self.cache = cache if cache is not None else ActivityCache(max_size, ttl_seconds)
+    
+    def get_activity_details(self, activity_id: str) -> StravaActivity:
+        """Return the cached activity if fresh, otherwise fetch and cache it"""
+        activity = self.cache.get(activity_id)
+        if activity is None:
+            activity = self.client.get_activity_details(activity_id)
+            self.cache.put(activity_id, activity)
+        return activity
+    
+    def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Write through to the wrapped client and refresh the cached copy"""
+        activity = self.client.update_activity(activity_id, updates)
+        self.cache.put(activity_id, activity)
+        return activity
+    
+    def get_activity_streams(self, activity_id: str, keys: Optional[Sequence[str]] = None):
+        """Streams are large and fetched rarely, so they pass straight through"""
+        return self.client.get_activity_streams(activity_id, keys)
+    
+    def list_athlete_activities(self, after=None, before=None, page: int = 1, per_page: int = 30):
+        """Listings change as activities are uploaded, so they pass straight through"""
+        return self.client.list_athlete_activities(after=after, before=before, page=page, per_page=per_page)
+    
+    def invalidate(self, activity_id: str) -> bool:
+        """Forget an activity after it has been mutated elsewhere"""
+        return self.cache.invalidate(activity_id)
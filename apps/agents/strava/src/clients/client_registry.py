@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from .strava_client import StravaClient, MockStravaClient
+
+
+@dataclass
+class _RegistryEntry:
+    """A pooled client and the last time it was handed out"""
+    client: StravaClient
+    last_used: float
+
+
+class StravaClientRegistry:
+    """Process-wide registry of warm Strava clients.
+
+    Real clients are keyed by athlete id when known (so a refreshed token
+    reuses the existing connection pool) or by a hash of the access token.
+    Mock clients are keyed by fixtures path so fixtures are parsed once.
+    """
+    
+    def __init__(
+        self,
+        pool_size: int = 10,
+        idle_timeout: float = 300.0,
+        base_url: str = "https://www.strava.com/api/v3",
+        lazy_parsing: bool = False,
+    ):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.base_url = base_url
+        self.lazy_parsing = lazy_parsing
+        self._lock = threading.Lock()
+        self._clients: Dict[str, _RegistryEntry] = {}
+        self._mock_clients: Dict[Optional[Path], MockStravaClient] = {}
+    
+    @staticmethod
+    def _token_key(access_token: str) -> str:
+        """Registry key for a token; the raw token is never stored as a key"""
+        return "token:" + hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+    
+    def get_client(self, access_token: str, athlete_id: Optional[int] = None) -> StravaClient:
+        """Return a warm client for this athlete/token, creating it if needed"""
+        key = f"athlete:{athlete_id}" if athlete_id is not None else self._token_key(access_token)
+        now = time.monotonic()
+        
+        with self._lock:
+            self._evict_idle_locked(now)
+            
+            entry = self._clients.get(key)
+            if entry is None:
+                client = StravaClient(
+                    access_token,
+                    base_url=self.base_url,
+                    pool_size=self.pool_size,
+                    lazy_parsing=self.lazy_parsing,
+                )
+                entry = _RegistryEntry(client=client, last_used=now)
+                self._clients[key] = entry
+            elif entry.client.access_token != access_token:
+                # Token was refreshed for a known athlete: rotate in place
+                entry.client.set_access_token(access_token)
+            
+            entry.last_used = now
+            return entry.client
+    
+    def rotate_token(self, old_token: str, new_token: str) -> bool:
+        """Move a token-keyed client to a refreshed token, keeping its connections"""
+        old_key = self._token_key(old_token)
+        with self._lock:
+            entry = self._clients.pop(old_key, None)
+            if entry is None:
+                return False
+            entry.client.set_access_token(new_token)
+            entry.last_used = time.monotonic()
+            self._clients[self._token_key(new_token)] = entry
+            return True
+    
+    def get_mock_client(self, fixtures_path: Optional[Path] = None) -> MockStravaClient:
+        """Return a shared mock client so fixtures are only indexed once"""
+        with self._lock:
+            client = self._mock_clients.get(fixtures_path)
+            if client is None:
+                client = MockStravaClient(fixtures_path, lazy_parsing=self.lazy_parsing)
+                self._mock_clients[fixtures_path] = client
+            return client
+    
+    def evict_idle(self) -> int:
+        """Close clients that have not been used within idle_timeout"""
+        with self._lock:
+            return self._evict_idle_locked(time.monotonic())
+    
+    def _evict_idle_locked(self, now: float) -> int:
+        expired = [key for key, entry in self._clients.items() if now - entry.last_used > self.idle_timeout]
+        for key in expired:
+            self._clients.pop(key).client.close()
+        return len(expired)
+    
+    def close_all(self):
+        """Close every pooled client and drop cached mocks"""
+        with self._lock:
+            for entry in self._clients.values():
+                entry.client.close()
+            self._clients.clear()
+            self._mock_clients.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
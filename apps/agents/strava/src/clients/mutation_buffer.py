@@ -0,0 +1,81 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from models.strava_models import StravaActivity
+from .strava_client import StravaClientInterface
+
+# Strava's PUT /activities/{id} takes a visibility value rather than our privacy names
+PRIVACY_TO_VISIBILITY = {
+    "public": "everyone",
+    "followers_only": "followers_only",
+    "private": "only_me",
+}
+
+_current_buffer: contextvars.ContextVar[Optional["ActivityMutationBuffer"]] = contextvars.ContextVar(
+    "activity_mutation_buffer", default=None
+)
+
+
+@dataclass
+class MutationFlushResult:
+    """Outcome of flushing a mutation buffer"""
+    updated: Dict[str, StravaActivity] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class ActivityMutationBuffer:
+    """Collects activity field changes for one agent turn and writes each activity once.
+
+    "Choose 3 and make it private" stages a name and a visibility change for
+    the same activity; flush() merges them into a single PUT. A flushed buffer
+    refuses further changes, so a tool call still running after its turn ended
+    fails instead of staging an edit that would never be written.
+    """
+    
+    def __init__(self, client: StravaClientInterface):
+        self.client = client
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flushed = False
+    
+    @staticmethod
+    def current() -> Optional["ActivityMutationBuffer"]:
+        """The buffer for the agent turn in progress, if any"""
+        return _current_buffer.get()
+    
+    @contextmanager
+    def turn(self):
+        """Make this buffer current for the enclosed agent turn"""
+        token = _current_buffer.set(self)
+        try:
+            yield self
+        finally:
+            _current_buffer.reset(token)
+    
+    def stage(self, activity_id: str, **fields: Any):
+        """Queue field changes; later values for the same field win"""
+        with self._lock:
+            if self._flushed:
+                raise Exception(f"Changes to activity {activity_id} arrived after this turn's updates were saved")
+            self._pending.setdefault(activity_id, {}).update(fields)
+    
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {activity_id: dict(fields) for activity_id, fields in self._pending.items()}
+    
+    def flush(self) -> MutationFlushResult:
+        """Write all staged changes, one update call per activity"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = True
+        
+        result = MutationFlushResult()
+        for activity_id, fields in pending.items():
+            try:
+                result.updated[activity_id] = self.client.update_activity(activity_id, fields)
+            except Exception as e:
+                result.errors[activity_id] = str(e)
+        return result
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class RequestPriority(str, Enum):
+    """Scheduling class of a Strava request"""
+    INTERACTIVE = "interactive"  # A user is waiting on an SMS reply
+    BACKGROUND = "background"    # Webhooks, backfills and other deferred work
+
+
+class StravaRateLimitError(Exception):
+    """Raised when the Strava quota is exhausted or 429s persist after retries"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_current_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "strava_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+def _parse_pair(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a '15-minute,daily' header value such as '200,2000'"""
+    if not value:
+        return None
+    try:
+        short, daily = (int(part.strip()) for part in value.split(",")[:2])
+        return short, daily
+    except ValueError:
+        return None
+
+
+class StravaRateLimiter:
+    """Token-bucket scheduler for Strava's 15-minute and daily quotas.
+
+    The 15-minute bucket refills continuously and is re-synced from the
+    X-RateLimit-Limit / X-RateLimit-Usage headers on every response.
+    Background requests may not dip into the last `background_reserve`
+    fraction of either quota, which is kept for interactive requests.
+    """
+    
+    SHORT_WINDOW_SECONDS = 15 * 60
+    
+    def __init__(
+        self,
+        short_limit: int = 200,
+        daily_limit: int = 2000,
+        background_reserve: float = 0.2,
+        max_retries: int = 3,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_wait: Optional[Dict[RequestPriority, float]] = None,
+    ):
+        self.short_limit = short_limit
+        self.daily_limit = daily_limit
+        self.background_reserve = background_reserve
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait or {
+            RequestPriority.INTERACTIVE: 10.0,
+            RequestPriority.BACKGROUND: float(self.SHORT_WINDOW_SECONDS),
+        }
+        self._lock = threading.Lock()
+        self._short_tokens = float(short_limit)
+        self._updated_at = time.monotonic()
+        self._daily_used = 0
+        self._day = datetime.now(timezone.utc).date()
+        self._counters = {"requests": 0, "throttled": 0, "rate_limited": 0, "retries": 0}
+    
+    @contextmanager
+    def priority(self, priority: RequestPriority):
+        """Run the enclosed Strava calls with the given priority"""
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+    
+    def _refill_locked(self, now: float):
+        elapsed = now - self._updated_at
+        self._short_tokens = min(
+            float(self.short_limit),
+            self._short_tokens + elapsed * self.short_limit / self.SHORT_WINDOW_SECONDS,
+        )
+        self._updated_at = now
+        today = datetime.now(timezone.utc).date()
+        if today != self._day:
+            self._day = today
+            self._daily_used = 0
+    
+    def _seconds_until_utc_midnight(self) -> float:
+        now = datetime.now(timezone.utc)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return (midnight - now).total_seconds()
+    
+    def reserve(self, priority: Optional[RequestPriority] = None) -> float:
+        """Take a request slot and return 0, or return the seconds to wait before retrying"""
+        priority = priority or _current_priority.get()
+        reserve = self.background_reserve if priority == RequestPriority.BACKGROUND else 0.0
+        
+        with self._lock:
+            self._refill_locked(time.monotonic())
+            
+            if self._daily_used >= self.daily_limit * (1 - reserve):
+                return self._seconds_until_utc_midnight()
+            
+            short_floor = self.short_limit * reserve
+            if self._short_tokens - 1 < short_floor:
+                missing = short_floor + 1 - self._short_tokens
+                return missing * self.SHORT_WINDOW_SECONDS / self.short_limit
+            
+            self._short_tokens -= 1
+            self._daily_used += 1
+            self._counters["requests"] += 1
+            return 0.0
+    
+    def _check_wait(self, wait: float, waited: float, priority: RequestPriority):
+        if waited + wait > self.max_wait[priority]:
+            raise StravaRateLimitError(
+                f"Strava quota exhausted for {priority.value} requests; retry in {wait:.0f}s",
+                retry_after=wait,
+            )
+        with self._lock:
+            self._counters["throttled"] += 1
+    
+    def acquire(self, priority: Optional[RequestPriority] = None):
+        """Block until a request slot is available for this priority"""
+        priority = priority or _current_priority.get()
+        waited = 0.0
+        while True:
+            wait = self.reserve(priority)
+            if wait <= 0:
+                return
+            self._check_wait(wait, waited, priority)
+            time.sleep(wait)
+            waited += wait
+    
+    async def acquire_async(self, priority: Optional[RequestPriority] = None):
+        """Asyncio variant of acquire()"""
+        priority = priority or _current_priority.get()
+        waited = 0.0
+        while True:
+            wait = self.reserve(priority)
+            if wait <= 0:
+                return
+            self._check_wait(wait, waited, priority)
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Re-sync both buckets from Strava's rate limit response headers"""
+        limits = _parse_pair(headers.get("X-RateLimit-Limit"))
+        usage = _parse_pair(headers.get("X-RateLimit-Usage"))
+        if not limits or not usage:
+            return
+        with self._lock:
+            self.short_limit, self.daily_limit = limits
+            self._short_tokens = float(max(0, limits[0] - usage[0]))
+            self._daily_used = usage[1]
+            self._updated_at = time.monotonic()
+    
+    def record_rate_limited(self):
+        """Note a 429 and drain the short bucket until the headers say otherwise"""
+        with self._lock:
+            self._counters["rate_limited"] += 1
+            self._short_tokens = 0.0
+            self._updated_at = time.monotonic()
+    
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before retry number `attempt`, honouring Retry-After when present"""
+        with self._lock:
+            self._counters["retries"] += 1
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        # Full jitter keeps a burst of workers from retrying in lockstep
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+    
+    def headroom(self) -> Dict[str, float]:
+        """Current quota headroom and scheduler counters"""
+        with self._lock:
+            self._refill_locked(time.monotonic())
+            return {
+                "short_limit": self.short_limit,
+                "short_remaining": int(self._short_tokens),
+                "daily_limit": self.daily_limit,
+                "daily_remaining": max(0, self.daily_limit - self._daily_used),
+                **self._counters,
+            }
+
+
+# Shared by every client instance in the process
+default_rate_limiter = StravaRateLimiter()
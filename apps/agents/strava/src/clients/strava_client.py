@@ -1,10 +1,25 @@
 import json
+import os
+import re
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Tuple, Union, TYPE_CHECKING
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from models.strava_models import StravaActivity
+from models.strava_models import StravaActivity, StravaActivityBase, parse_activity, parse_activity_list
+from .rate_limiter import StravaRateLimiter, StravaRateLimitError, default_rate_limiter
+from telemetry import endpoint_template, telemetry
+
+# The top-level start_date precedes laps and segment efforts in Strava's (and the generator's) key order
+_START_DATE_RE = re.compile(rb'"start_date"\s*:\s*"([^"]+)"')
+
+if TYPE_CHECKING:
+    from analytics.streams import ActivityStreams
+    from .synthetic_activities import SyntheticActivityGenerator
 
 
 class StravaClientInterface(ABC):
@@ -14,43 +29,194 @@ class StravaClientInterface(ABC):
     def get_activity_details(self, activity_id: str) -> StravaActivity:
         """Retrieve detailed information about a specific activity"""
         pass
+    
+    @abstractmethod
+    def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Apply field changes to an activity in one write and return the updated activity"""
+        pass
+    
+    @abstractmethod
+    def get_activity_streams(self, activity_id: str, keys: Optional[Sequence[str]] = None) -> "ActivityStreams":
+        """Retrieve per-sample streams (time, distance, heartrate, altitude, cadence) for an activity"""
+        pass
+    
+    @abstractmethod
+    def list_athlete_activities(
+        self, after: Optional[int] = None, before: Optional[int] = None, page: int = 1, per_page: int = 30
+    ) -> List[StravaActivityBase]:
+        """List the athlete's activities, newest first, optionally bounded by epoch timestamps"""
+        pass
 
 
 class StravaClient(StravaClientInterface):
     """Production Strava API client"""
     
-    def __init__(self, access_token: str, base_url: str = "https://www.strava.com/api/v3"):
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = "https://www.strava.com/api/v3",
+        pool_size: int = 10,
+        rate_limiter: Optional[StravaRateLimiter] = None,
+        lazy_parsing: bool = False,
+        timeout: Tuple[float, float] = (3.05, 15.0),
+    ):
         self.access_token = access_token
         self.base_url = base_url
+        self.lazy_parsing = lazy_parsing
+        # (connect, read) seconds; a hung connection would otherwise block a worker indefinitely
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or default_rate_limiter
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
         })
+        # Keep-alive pool so repeated calls reuse warm TCP+TLS connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def set_access_token(self, access_token: str):
+        """Swap the bearer token in place without dropping pooled connections"""
+        self.access_token = access_token
+        self.session.headers['Authorization'] = f'Bearer {access_token}'
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+    
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request through the shared rate limiter, retrying 429s, 5xx and timeouts with backoff"""
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            self.rate_limiter.acquire()
+            with telemetry.span("strava_http", method=method, endpoint=endpoint_template(path)) as span:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    span.set(status=type(e).__name__)
+                    if attempt < self.rate_limiter.max_retries:
+                        time.sleep(self.rate_limiter.backoff_delay(attempt))
+                        continue
+                    raise
+                span.set(status=response.status_code)
+            self.rate_limiter.update_from_headers(response.headers)
+            
+            if response.status_code == 429 or response.status_code >= 500:
+                if response.status_code == 429:
+                    self.rate_limiter.record_rate_limited()
+                if attempt < self.rate_limiter.max_retries:
+                    time.sleep(self.rate_limiter.backoff_delay(attempt, response.headers.get('Retry-After')))
+                    continue
+                if response.status_code == 429:
+                    raise StravaRateLimitError(f"Strava rate limit exceeded for {method} {path}")
+            
+            response.raise_for_status()
+            return response
     
     def get_activity_details(self, activity_id: str) -> StravaActivity:
         """Fetch activity details from Strava API"""
         try:
-            url = f"{self.base_url}/activities/{activity_id}"
-            response = self.session.get(url, params={'include_all_efforts': False})
-            response.raise_for_status()
+            response = self._request('GET', f"/activities/{activity_id}", params={'include_all_efforts': False})
             
-            activity_data = response.json()
-            return StravaActivity(**activity_data)
+            # Parse straight from the response bytes, skipping response.json()
+            with telemetry.span("strava_parse", model="activity"):
+                return parse_activity(response.content, lazy=self.lazy_parsing)
             
+        except StravaRateLimitError:
+            raise
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to fetch activity {activity_id} from Strava API: {str(e)}")
         except Exception as e:
             raise Exception(f"Failed to parse activity {activity_id} data: {str(e)}")
+    
+    def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Update an activity with a single PUT /activities/{id}"""
+        try:
+            response = self._request('PUT', f"/activities/{activity_id}", json=updates)
+            with telemetry.span("strava_parse", model="activity"):
+                return parse_activity(response.content, lazy=self.lazy_parsing)
+            
+        except StravaRateLimitError:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to update activity {activity_id} on Strava API: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to parse updated activity {activity_id} data: {str(e)}")
+    
+    def get_activity_streams(self, activity_id: str, keys: Optional[Sequence[str]] = None) -> "ActivityStreams":
+        """Fetch activity streams from Strava API into NumPy arrays"""
+        # Imported here so numpy stays off the cold-start path
+        from analytics.streams import ActivityStreams, STREAM_KEYS
+        try:
+            response = self._request(
+                'GET',
+                f"/activities/{activity_id}/streams",
+                params={'keys': ','.join(keys or STREAM_KEYS), 'key_by_type': 'true'},
+            )
+            return ActivityStreams.from_response(response.content)
+            
+        except StravaRateLimitError:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to fetch streams for activity {activity_id} from Strava API: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to parse streams for activity {activity_id}: {str(e)}")
+    
+    def list_athlete_activities(
+        self, after: Optional[int] = None, before: Optional[int] = None, page: int = 1, per_page: int = 30
+    ) -> List[StravaActivityBase]:
+        """Fetch one page of GET /athlete/activities"""
+        params: Dict[str, Any] = {'page': page, 'per_page': per_page}
+        if after is not None:
+            params['after'] = after
+        if before is not None:
+            params['before'] = before
+        try:
+            response = self._request('GET', "/athlete/activities", params=params)
+            with telemetry.span("strava_parse", model="activity_list"):
+                return parse_activity_list(response.content)
+            
+        except StravaRateLimitError:
+            raise
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to list athlete activities from Strava API: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to parse athlete activities: {str(e)}")
+
+
+def _epoch(start_date: str) -> int:
+    return int(datetime.fromisoformat(start_date.replace("Z", "+00:00")).timestamp())
 
 
 class MockStravaClient(StravaClientInterface):
-    """Mock Strava client for testing and development"""
+    """Mock Strava client for testing and development.
+    
+    Fixtures are indexed by file name on first use and each one is read only
+    when its activity is requested, so large fixture directories cost nothing
+    at construction. With a generator, ids that have no fixture are
+    synthesized instead of falling back to the single default activity.
+    """
     
-    def __init__(self, fixtures_path: Optional[Path] = None):
+    # Listed when the fixtures directory is empty: one activity a day, newest first, ids 1000 upward
+    DEFAULT_HISTORY_FIRST_ID = 1000
+    DEFAULT_HISTORY_SIZE = 10
+    
+    def __init__(
+        self,
+        fixtures_path: Optional[Path] = None,
+        lazy_parsing: bool = False,
+        generator: Optional["SyntheticActivityGenerator"] = None,
+    ):
         self.fixtures_path = fixtures_path or self._get_default_fixtures_path()
+        self.lazy_parsing = lazy_parsing
+        self.generator = generator
+        # Added and updated activities, which take precedence over fixture files
         self._activity_responses: Dict[str, Dict[str, Any]] = {}
-        self._load_default_fixtures()
+        self._fixture_index: Optional[Dict[str, Path]] = None
+        self._fixture_starts: Optional[Dict[str, int]] = None
+        self._index_lock = threading.Lock()
     
     def _get_default_fixtures_path(self) -> Path:
         """Get the default path to fixture files"""
@@ -58,38 +224,154 @@ class MockStravaClient(StravaClientInterface):
         # Navigate to tests/fixtures/strava_responses from src/clients/
         return current_file.parent.parent.parent / "tests" / "fixtures" / "strava_responses"
     
-    def _load_default_fixtures(self):
-        """Load all available fixture files"""
-        if self.fixtures_path.exists():
-            for fixture_file in self.fixtures_path.glob("activity_*.json"):
-                try:
-                    # Extract activity ID from filename (e.g., "activity_12345_run.json" -> "12345")
-                    filename = fixture_file.stem
-                    parts = filename.split("_")
+    @property
+    def fixture_index(self) -> Dict[str, Path]:
+        """Activity id to fixture file, built from file names on first use"""
+        if self._fixture_index is None:
+            with self._index_lock:
+                if self._fixture_index is None:
+                    self._fixture_index = self._index_fixtures()
+        return self._fixture_index
+    
+    def _index_fixtures(self) -> Dict[str, Path]:
+        """Index activity_<id>_*.json files by id without reading them"""
+        index: Dict[str, Path] = {}
+        if not self.fixtures_path.is_dir():
+            return index
+        with os.scandir(self.fixtures_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("activity_") and name.endswith(".json"):
+                    # e.g. "activity_12345_run.json" -> "12345"
+                    parts = name[:-5].split("_")
                     if len(parts) >= 2:
-                        activity_id = parts[1]
-                        
-                        with open(fixture_file, 'r') as f:
-                            fixture_data = json.load(f)
-                        
-                        self._activity_responses[activity_id] = fixture_data
-                        
-                except Exception as e:
-                    print(f"Warning: Failed to load fixture {fixture_file}: {e}")
+                        index[parts[1]] = Path(entry.path)
+        return index
+    
+    @property
+    def fixture_starts(self) -> Dict[str, int]:
+        """Activity id to start time (epoch seconds), read from each fixture's head on first listing"""
+        if self._fixture_starts is None:
+            index = self.fixture_index
+            with self._index_lock:
+                if self._fixture_starts is None:
+                    self._fixture_starts = {activity_id: self._fixture_start(path) for activity_id, path in index.items()}
+        return self._fixture_starts
+    
+    @staticmethod
+    def _fixture_start(path: Path) -> int:
+        with open(path, "rb") as f:
+            match = _START_DATE_RE.search(f.read(4096))
+        start_date = match.group(1).decode() if match else json.loads(path.read_bytes())["start_date"]
+        return _epoch(start_date)
     
     def add_activity_response(self, activity_id: str, activity_data: Dict[str, Any]):
         """Manually add a mock response for testing"""
         self._activity_responses[activity_id] = activity_data
     
+    def _activity_source(self, activity_id: str) -> Union[bytes, Dict[str, Any]]:
+        """Raw fixture bytes, or a dict for added, generated and default activities"""
+        if activity_id in self._activity_responses:
+            return self._activity_responses[activity_id]
+        fixture_file = self.fixture_index.get(activity_id)
+        if fixture_file is not None:
+            return fixture_file.read_bytes()
+        history_day = self._default_history_day(activity_id)
+        if history_day is not None:
+            return self._create_default_history_activity(history_day)
+        if self.generator is not None:
+            return self.generator.activity(int(activity_id))
+        # Return a default mock activity if no specific fixture exists
+        return self._create_default_activity(activity_id)
+    
+    def _activity_data(self, activity_id: str) -> Dict[str, Any]:
+        source = self._activity_source(activity_id)
+        return json.loads(source) if isinstance(source, bytes) else source
+    
     def get_activity_details(self, activity_id: str) -> StravaActivity:
         """Return mock activity data"""
-        if activity_id in self._activity_responses:
-            activity_data = self._activity_responses[activity_id]
-            return StravaActivity(**activity_data)
+        return parse_activity(self._activity_source(activity_id), lazy=self.lazy_parsing)
+    
+    def update_activity(self, activity_id: str, updates: Dict[str, Any]) -> StravaActivity:
+        """Merge updates into the mock activity, mirroring Strava's PUT semantics"""
+        activity_data = dict(self._activity_data(activity_id))
+        activity_data.update(updates)
+        if "visibility" in updates:
+            activity_data["private"] = updates["visibility"] == "only_me"
+        self._activity_responses[activity_id] = activity_data
+        return parse_activity(activity_data, lazy=self.lazy_parsing)
+    
+    def get_activity_streams(self, activity_id: str, keys: Optional[Sequence[str]] = None) -> "ActivityStreams":
+        """Return streams from a streams_<id>.json fixture, or synthesize them from the activity"""
+        from analytics.streams import ActivityStreams, STREAM_KEYS, synthetic_streams
         
-        # Return a default mock activity if no specific fixture exists
-        default_activity = self._create_default_activity(activity_id)
-        return StravaActivity(**default_activity)
+        fixture_file = self.fixtures_path / f"streams_{activity_id}.json"
+        if fixture_file.exists():
+            streams = ActivityStreams.from_response(fixture_file.read_bytes())
+        else:
+            activity = self.get_activity_details(activity_id)
+            streams = synthetic_streams(
+                activity.moving_time,
+                activity.distance,
+                activity.average_heartrate if activity.has_heartrate else None,
+                seed=activity.id,
+            )
+        
+        wanted = set(keys or STREAM_KEYS) | {"time"}
+        for key in STREAM_KEYS:
+            if key not in wanted:
+                setattr(streams, key, None)
+        return streams
+    
+    def list_athlete_activities(
+        self, after: Optional[int] = None, before: Optional[int] = None, page: int = 1, per_page: int = 30
+    ) -> List[StravaActivityBase]:
+        """Page through fixture activities, or a generated history when there are none.
+        
+        Filtering and ordering use the fixtures' start times, so only the
+        returned page is read and parsed. Added and updated activities are
+        listed over the fixtures or the default history.
+        """
+        if self.fixture_starts:
+            starts = dict(self.fixture_starts)
+        else:
+            history = self._create_default_history()
+            starts = {str(a["id"]): _epoch(a["start_date"]) for a in history}
+        for activity_id, activity_data in self._activity_responses.items():
+            starts[activity_id] = _epoch(activity_data["start_date"])
+        
+        matching = sorted(
+            (activity_id for activity_id, start in starts.items()
+             if (after is None or start > after) and (before is None or start < before)),
+            key=starts.__getitem__,
+            reverse=True,
+        )
+        first = (page - 1) * per_page
+        return parse_activity_list([self._activity_data(activity_id) for activity_id in matching[first:first + per_page]])
+    
+    def _default_history_day(self, activity_id: str) -> Optional[int]:
+        """Days before today of a default-history activity id, or None when fixtures exist or the id isn't one"""
+        if self.fixture_index or not activity_id.isdigit():
+            return None
+        day = int(activity_id) - self.DEFAULT_HISTORY_FIRST_ID
+        return day if 0 <= day < self.DEFAULT_HISTORY_SIZE else None
+    
+    def _create_default_history(self) -> List[Dict[str, Any]]:
+        """A short daily history ending today: generated activities, or alternating runs and rides"""
+        return [self._create_default_history_activity(day) for day in range(self.DEFAULT_HISTORY_SIZE)]
+    
+    def _create_default_history_activity(self, day: int) -> Dict[str, Any]:
+        """The default-history activity `day` days before today (ids 1000 upward)"""
+        activity_id = str(self.DEFAULT_HISTORY_FIRST_ID + day)
+        start = datetime.now(timezone.utc).replace(hour=14, minute=30, second=0, microsecond=0) - timedelta(days=day)
+        if self.generator is not None:
+            return self.generator.activity(int(activity_id), start=start)
+        activity_data = self._create_default_activity(activity_id)
+        activity_data["start_date"] = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        activity_data["start_date_local"] = (start - timedelta(hours=8)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if day % 2:
+            activity_data.update(type="Ride", sport_type="Ride", distance=20000.0 + 1500 * day, average_speed=7.5)
+        return activity_data
     
     def _create_default_activity(self, activity_id: str) -> Dict[str, Any]:
         """Create a default mock activity for testing"""
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from analytics.polyline import encode_polyline
+
+
+@dataclass(frozen=True)
+class SportProfile:
+    """Typical ranges used to generate one sport's activities"""
+    sport_type: str
+    activity_type: str
+    speed_mps: Tuple[float, float]
+    distance_m: Tuple[float, float]
+    heartrate: Optional[Tuple[float, float]]
+    cadence: Optional[Tuple[float, float]]
+    climb_m_per_km: Tuple[float, float]
+    lap_m: float
+    gear: Optional[str]
+    weight: float
+
+
+SPORT_PROFILES = (
+    SportProfile("Run", "Run", (2.4, 4.2), (3_000, 25_000), (135, 172), (160, 185), (2, 20), 1_000, "Pegasus 40", 0.35),
+    SportProfile("TrailRun", "Run", (1.8, 3.2), (6_000, 40_000), (135, 168), (150, 175), (20, 60), 1_000, "Speedgoat 5", 0.06),
+    SportProfile("Ride", "Ride", (6.0, 10.0), (15_000, 160_000), (120, 160), (80, 95), (3, 15), 5_000, "Tarmac SL7", 0.25),
+    SportProfile("GravelRide", "Ride", (5.0, 8.0), (20_000, 120_000), (120, 158), (75, 90), (5, 18), 5_000, "Crux", 0.05),
+    SportProfile("VirtualRide", "VirtualRide", (7.0, 10.5), (15_000, 60_000), (125, 165), (80, 95), (0, 12), 5_000, None, 0.06),
+    SportProfile("Walk", "Walk", (1.1, 1.6), (1_500, 8_000), (90, 115), (100, 120), (1, 10), 1_000, None, 0.08),
+    SportProfile("Hike", "Hike", (0.9, 1.5), (5_000, 25_000), (105, 140), (90, 110), (30, 90), 1_000, "Lone Peak", 0.06),
+    SportProfile("Swim", "Swim", (0.7, 1.4), (1_000, 4_000), (120, 150), None, (0, 0), 100, None, 0.05),
+    SportProfile("WeightTraining", "WeightTraining", (0.0, 0.0), (0, 0), (100, 135), None, (0, 0), 0, None, 0.04),
+)
+
+CITIES = (
+    ("San Francisco", "California", "United States", (37.7749, -122.4194), -28800, "America/Los_Angeles"),
+    ("Boulder", "Colorado", "United States", (40.0150, -105.2705), -25200, "America/Denver"),
+    ("London", "England", "United Kingdom", (51.5072, -0.1276), 0, "Europe/London"),
+    ("Melbourne", "Victoria", "Australia", (-37.8136, 144.9631), 36000, "Australia/Melbourne"),
+    ("Girona", "Catalonia", "Spain", (41.9794, 2.8214), 3600, "Europe/Madrid"),
+)
+
+ROUTE_SHAPES = ("loop", "out_and_back", "point_to_point")
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SyntheticActivityGenerator:
+    """Seeded generator of realistic Strava DetailedActivity responses.
+
+    Each activity is derived from (seed, activity_id) alone, so any id can be
+    generated on demand in any order and always comes out the same. Size is
+    controlled per call: route points for the polyline, laps, and segment
+    efforts can each run into the thousands.
+    """
+    
+    def __init__(self, seed: int = 0, athlete_id: int = 134815):
+        self.seed = seed
+        self.athlete_id = athlete_id
+        self._profile_weights = [profile.weight for profile in SPORT_PROFILES]
+    
+    def _rng(self, activity_id: int) -> random.Random:
+        digest = hashlib.blake2b(f"{self.seed}:{activity_id}".encode(), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "big"))
+    
+    def activity(
+        self,
+        activity_id: int,
+        sport_type: Optional[str] = None,
+        route_points: Optional[int] = None,
+        laps: Optional[int] = None,
+        segment_efforts: int = 0,
+        start: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Generate one activity as a Strava API response dict"""
+        activity_id = int(activity_id)
+        rng = self._rng(activity_id)
+        profile = self._profile(rng, sport_type)
+        city, state, country, origin, utc_offset, tz_name = rng.choice(CITIES)
+        
+        distance = round(rng.uniform(*profile.distance_m), 1)
+        speed = rng.uniform(*profile.speed_mps)
+        moving_time = int(distance / speed) if speed else rng.randint(1_800, 5_400)
+        elapsed_time = int(moving_time * rng.uniform(1.0, 1.15))
+        climb = round(distance / 1000 * rng.uniform(*profile.climb_m_per_km), 1)
+        start = start or EPOCH + timedelta(
+            days=activity_id % 1000, hours=rng.choice((6, 7, 12, 17, 18)), minutes=rng.randrange(60)
+        )
+        local_start = start + timedelta(seconds=utc_offset)
+        
+        indoor = profile.sport_type in ("VirtualRide", "WeightTraining", "Swim") or distance == 0
+        route_points = route_points if route_points is not None else (0 if indoor else max(int(distance / 25), 2))
+        polyline, end_latlng, elevation = self._route(rng, origin, distance, route_points)
+        heartrate = rng.uniform(*profile.heartrate) if profile.heartrate else None
+        
+        activity = {
+            "id": activity_id,
+            "resource_state": 3,
+            "external_id": f"synthetic_{activity_id}.fit",
+            "upload_id": activity_id * 10 + 7,
+            "athlete": {"id": self.athlete_id, "resource_state": 1},
+            "name": f"{self._time_of_day(local_start)} {profile.sport_type}",
+            "distance": distance,
+            "moving_time": moving_time,
+            "elapsed_time": elapsed_time,
+            "total_elevation_gain": climb,
+            "type": profile.activity_type,
+            "sport_type": profile.sport_type,
+            "start_date": _iso(start),
+            "start_date_local": _iso(local_start),
+            "timezone": f"(GMT{utc_offset // 3600:+03d}:00) {tz_name}",
+            "utc_offset": utc_offset,
+            "start_latlng": [] if indoor else list(origin),
+            "end_latlng": [] if indoor else end_latlng,
+            "location_city": city,
+            "location_state": state,
+            "location_country": country,
+            "achievement_count": rng.randint(0, 8),
+            "kudos_count": rng.randint(0, 60),
+            "comment_count": rng.randint(0, 6),
+            "athlete_count": rng.choice((1, 1, 1, 2, 4)),
+            "photo_count": 0,
+            "map": {
+                "id": f"a{activity_id}",
+                "polyline": polyline,
+                "resource_state": 3,
+                "summary_polyline": polyline[:200] if polyline else None,
+            },
+            "trainer": profile.sport_type == "VirtualRide",
+            "commute": profile.activity_type == "Ride" and rng.random() < 0.1,
+            "manual": False,
+            "private": rng.random() < 0.05,
+            "flagged": False,
+            "gear_id": f"g{activity_id % 7}" if profile.gear else None,
+            "from_accepted_tag": False,
+            "average_speed": round(speed, 3),
+            "max_speed": round(speed * rng.uniform(1.2, 1.8), 3),
+            "average_cadence": round(rng.uniform(*profile.cadence), 1) if profile.cadence else None,
+            "average_temp": rng.randint(-2, 32),
+            "has_heartrate": heartrate is not None,
+            "average_heartrate": round(heartrate, 1) if heartrate else None,
+            "max_heartrate": int(heartrate * rng.uniform(1.08, 1.15)) if heartrate else None,
+            "elev_high": round(elevation[1], 1),
+            "elev_low": round(elevation[0], 1),
+            "pr_count": rng.randint(0, 3),
+            "total_photo_count": 0,
+            "has_kudoed": False,
+            "workout_type": None,
+            "suffer_score": int(moving_time / 60 * rng.uniform(0.5, 2.0)) if heartrate else None,
+            "description": None,
+            "calories": round(moving_time / 60 * rng.uniform(7, 14), 1),
+            "device_name": rng.choice(("Garmin Forerunner 965", "Garmin Edge 840", "Apple Watch Ultra", "COROS PACE 3")),
+            "embed_token": hashlib.md5(f"{self.seed}:{activity_id}".encode()).hexdigest(),
+            "segment_leaderboard_opt_out": False,
+            "leaderboard_opt_out": False,
+            "splits_metric": self._splits(rng, distance, moving_time, climb),
+            "laps": self._laps(rng, activity_id, profile, distance, moving_time, climb, start, utc_offset, laps),
+            "gear": {
+                "id": f"g{activity_id % 7}",
+                "primary": True,
+                "name": profile.gear,
+                "resource_state": 2,
+                "distance": rng.randint(50_000, 3_000_000),
+            } if profile.gear else None,
+            "partner_brand_tag": None,
+            "photos": {"primary": None, "use_primary_photo": False, "count": 0},
+            "highlighted_kudosers": [],
+            "hide_from_home": False,
+            "segment_efforts": self._segment_efforts(rng, activity_id, distance, moving_time, start, utc_offset, segment_efforts),
+        }
+        return activity
+    
+    def activities(self, count: int, first_id: int = 1, **options) -> Iterator[Dict[str, Any]]:
+        """Generate `count` activities with consecutive ids"""
+        for activity_id in range(first_id, first_id + count):
+            yield self.activity(activity_id, **options)
+    
+    def write_fixtures(self, directory: Path, count: int, first_id: int = 1, **options) -> List[Path]:
+        """Write activities as activity_<id>_<sport>.json fixtures readable by MockStravaClient"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for activity in self.activities(count, first_id, **options):
+            path = directory / f"activity_{activity['id']}_{activity['sport_type'].lower()}.json"
+            path.write_text(json.dumps(activity, separators=(",", ":")))
+            paths.append(path)
+        return paths
+    
+    def _profile(self, rng: random.Random, sport_type: Optional[str]) -> SportProfile:
+        if sport_type is None:
+            return rng.choices(SPORT_PROFILES, self._profile_weights)[0]
+        for profile in SPORT_PROFILES:
+            if profile.sport_type.lower() == sport_type.lower():
+                return profile
+        raise ValueError(f"Unknown sport type '{sport_type}'. Must be one of: {[p.sport_type for p in SPORT_PROFILES]}")
+    
+    @staticmethod
+    def _time_of_day(local_start: datetime) -> str:
+        hour = local_start.hour
+        if hour < 12:
+            return "Morning"
+        if hour < 17:
+            return "Afternoon"
+        if hour < 21:
+            return "Evening"
+        return "Night"
+    
+    def _route(
+        self, rng: random.Random, origin: Tuple[float, float], distance: float, points: int
+    ) -> Tuple[Optional[str], List[float], Tuple[float, float]]:
+        """A smoothed random-walk route of the given shape, encoded as a polyline"""
+        base_elevation = rng.uniform(0, 1500)
+        if points < 2:
+            return None, [], (base_elevation, base_elevation)
+        
+        np_rng = np.random.default_rng(rng.getrandbits(32))
+        step_m = distance / (points - 1)
+        heading = np.cumsum(np_rng.normal(0, 0.25, points - 1)) + rng.uniform(0, 2 * np.pi)
+        shape = rng.choice(ROUTE_SHAPES)
+        if shape == "out_and_back":
+            # Retrace the outbound headings in reverse on the way back
+            half = (points - 1) // 2
+            heading[half:] = heading[:points - 1 - half][::-1] + np.pi
+        elif shape == "loop":
+            # Turn steadily through a full circle so the route closes on itself
+            heading = np.linspace(0, 2 * np.pi, points - 1) + np.cumsum(np_rng.normal(0, 0.05, points - 1))
+        
+        north = np.concatenate([[0.0], np.cumsum(np.cos(heading) * step_m)])
+        east = np.concatenate([[0.0], np.cumsum(np.sin(heading) * step_m)])
+        lat = origin[0] + north / 111_320
+        lng = origin[1] + east / (111_320 * np.cos(np.radians(origin[0])))
+        coords = np.column_stack([lat, lng])
+        
+        altitude = base_elevation + np.cumsum(np_rng.normal(0, 1.5, points))
+        return encode_polyline(coords), [round(float(lat[-1]), 6), round(float(lng[-1]), 6)], (
+            float(altitude.min()), float(altitude.max())
+        )
+    
+    @staticmethod
+    def _splits(rng: random.Random, distance: float, moving_time: int, climb: float) -> List[Dict[str, Any]]:
+        splits = []
+        full, remainder = divmod(distance, 1000)
+        count = int(full) + (1 if remainder >= 1 else 0)
+        pace = moving_time / distance if distance else 0
+        for index in range(count):
+            split_distance = 1000.0 if index < full else round(remainder, 1)
+            split_time = int(split_distance * pace * rng.uniform(0.93, 1.07))
+            splits.append({
+                "distance": split_distance,
+                "elapsed_time": split_time + rng.randint(0, 5),
+                "elevation_difference": round(rng.uniform(-1, 1) * climb / max(count, 1), 1),
+                "moving_time": split_time,
+                "split": index + 1,
+                "average_speed": round(split_distance / split_time, 2) if split_time else 0.0,
+                "pace_zone": rng.randint(0, 5),
+            })
+        return splits
+    
+    def _laps(
+        self, rng: random.Random, activity_id: int, profile: SportProfile, distance: float, moving_time: int,
+        climb: float, start: datetime, utc_offset: int, count: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        if count is None:
+            count = max(int(distance // profile.lap_m), 1) if profile.lap_m else 1
+        lap_distance = distance / count
+        lap_time = max(moving_time // count, 1)
+        laps, offset = [], 0
+        for index in range(count):
+            elapsed = int(lap_time * rng.uniform(0.95, 1.05))
+            lap_start = start + timedelta(seconds=offset)
+            laps.append({
+                "id": activity_id * 100_000 + index,
+                "resource_state": 2,
+                "name": f"Lap {index + 1}",
+                "activity": {"id": activity_id, "resource_state": 1},
+                "athlete": {"id": self.athlete_id, "resource_state": 1},
+                "elapsed_time": elapsed,
+                "moving_time": lap_time,
+                "start_date": _iso(lap_start),
+                "start_date_local": _iso(lap_start + timedelta(seconds=utc_offset)),
+                "distance": round(lap_distance, 1),
+                "start_index": offset,
+                "end_index": offset + lap_time,
+                "total_elevation_gain": round(climb / count, 1),
+                "average_speed": round(lap_distance / lap_time, 3),
+                "max_speed": round(lap_distance / lap_time * rng.uniform(1.1, 1.5), 3),
+                "average_cadence": round(rng.uniform(*profile.cadence), 1) if profile.cadence else None,
+                "lap_index": index + 1,
+                "split": index + 1,
+            })
+            offset += lap_time
+        return laps
+    
+    def _segment_efforts(
+        self, rng: random.Random, activity_id: int, distance: float, moving_time: int,
+        start: datetime, utc_offset: int, count: int,
+    ) -> List[Dict[str, Any]]:
+        efforts = []
+        for index in range(count):
+            segment_distance = round(rng.uniform(200, min(max(distance, 400), 5_000)), 1)
+            elapsed = int(segment_distance / max(distance / max(moving_time, 1), 0.5))
+            start_index = rng.randrange(max(moving_time - elapsed, 1))
+            effort_start = start + timedelta(seconds=start_index)
+            segment_id = rng.randrange(1_000_000, 40_000_000)
+            efforts.append({
+                "id": activity_id * 1_000_000 + index,
+                "resource_state": 2,
+                "name": f"Segment {segment_id}",
+                "activity": {"id": activity_id, "resource_state": 1},
+                "athlete": {"id": self.athlete_id, "resource_state": 1},
+                "elapsed_time": elapsed,
+                "moving_time": elapsed,
+                "start_date": _iso(effort_start),
+                "start_date_local": _iso(effort_start + timedelta(seconds=utc_offset)),
+                "distance": segment_distance,
+                "start_index": start_index,
+                "end_index": start_index + elapsed,
+                "segment": {
+                    "id": segment_id,
+                    "resource_state": 2,
+                    "name": f"Segment {segment_id}",
+                    "distance": segment_distance,
+                    "average_grade": round(rng.uniform(-4, 8), 1),
+                    "maximum_grade": round(rng.uniform(8, 20), 1),
+                    "climb_category": rng.choice((0, 0, 0, 1, 2)),
+                    "private": False,
+                    "hazardous": False,
+                    "starred": False,
+                },
+                "kom_rank": None,
+                "pr_rank": rng.choice((None, None, 1, 2, 3)),
+                "achievements": [],
+                "hidden": False,
+            })
+        return efforts
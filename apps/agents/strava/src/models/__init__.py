@@ -9,8 +9,13 @@ from .strava_models import (
     StravaKudoser,
     StravaSplitMetric,
     StravaLap,
-    StravaActivity
+    StravaActivityBase,
+    StravaActivity,
+    LazyStravaActivity,
+    parse_activity,
+    parse_activity_list
 )
+from .activity_projection import PROJECTIONS, project_activity, projection_savings, to_compact_json
 
 __all__ = [
     "StravaAthlete",
@@ -22,5 +27,13 @@ __all__ = [
     "StravaKudoser",
     "StravaSplitMetric",
     "StravaLap",
-    "StravaActivity"
+    "StravaActivityBase",
+    "StravaActivity",
+    "LazyStravaActivity",
+    "parse_activity",
+    "parse_activity_list",
+    "PROJECTIONS",
+    "project_activity",
+    "projection_savings",
+    "to_compact_json"
 ]
@@ -0,0 +1,148 @@
+import json
+from typing import Any, Dict, Optional
+
+from .strava_models import StravaActivityBase
+
+METERS_PER_KM = 1000.0
+METERS_PER_MILE = 1609.344
+
+# Rough bytes-per-token ratio for JSON text, used for savings reporting only
+BYTES_PER_TOKEN = 4
+
+FOOT_SPORTS = {"run", "trailrun", "virtualrun", "walk", "hike"}
+
+# Raw activity fields included in each projection
+PROJECTION_FIELDS: Dict[str, tuple] = {
+    "title": (
+        "id", "name", "type", "sport_type", "workout_type", "commute", "trainer",
+        "total_elevation_gain", "pr_count", "achievement_count", "average_heartrate",
+    ),
+    "privacy": (
+        "id", "name", "type", "sport_type", "private", "hide_from_home", "commute",
+    ),
+    "summary": (
+        "id", "name", "type", "sport_type", "workout_type", "commute", "trainer", "private",
+        "total_elevation_gain", "pr_count", "achievement_count", "kudos_count", "comment_count",
+        "average_heartrate", "max_heartrate", "calories", "suffer_score", "description", "device_name",
+    ),
+}
+
+# Derived human-friendly fields included in each projection
+PROJECTION_DERIVED: Dict[str, tuple] = {
+    "title": (
+        "distance_km", "distance_mi", "moving_time", "pace", "speed", "time_of_day", "weekday", "location", "route",
+    ),
+    "privacy": ("distance_km", "distance_mi", "start_time_local", "time_of_day", "location"),
+    "summary": (
+        "distance_km", "distance_mi", "moving_time", "elapsed_time", "pace", "speed",
+        "start_time_local", "time_of_day", "weekday", "location", "gear", "route",
+    ),
+}
+
+PROJECTIONS = tuple(PROJECTION_FIELDS)
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS or M:SS"""
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def _time_of_day(hour: int) -> str:
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 21:
+        return "evening"
+    return "night"
+
+
+def _derive(activity: StravaActivityBase, name: str) -> Optional[Any]:
+    """Compute a single derived field, or None when it doesn't apply"""
+    is_foot_sport = activity.sport_type.lower() in FOOT_SPORTS
+    
+    if name == "distance_km":
+        return round(activity.distance / METERS_PER_KM, 1)
+    if name == "distance_mi":
+        return round(activity.distance / METERS_PER_MILE, 1)
+    if name == "moving_time":
+        return _format_duration(activity.moving_time)
+    if name == "elapsed_time":
+        return _format_duration(activity.elapsed_time)
+    if name == "pace":
+        if not is_foot_sport or activity.distance <= 0:
+            return None
+        return {
+            "per_km": _format_duration(activity.moving_time / (activity.distance / METERS_PER_KM)),
+            "per_mi": _format_duration(activity.moving_time / (activity.distance / METERS_PER_MILE)),
+        }
+    if name == "speed":
+        if is_foot_sport:
+            return None
+        return {
+            "kmh": round(activity.average_speed * 3.6, 1),
+            "mph": round(activity.average_speed * 3600 / METERS_PER_MILE, 1),
+        }
+    if name == "start_time_local":
+        # Strava reports local wall-clock time with a 'Z' suffix; use it as-is
+        return activity.start_date_local.strftime("%Y-%m-%d %H:%M")
+    if name == "time_of_day":
+        return _time_of_day(activity.start_date_local.hour)
+    if name == "weekday":
+        return activity.start_date_local.strftime("%A")
+    if name == "location":
+        parts = [activity.location_city, activity.location_state]
+        return ", ".join(part for part in parts if part) or None
+    if name == "gear":
+        return activity.gear.name if activity.gear else None
+    if name == "route":
+        polyline = activity.map.polyline or activity.map.summary_polyline
+        if not polyline:
+            return None
+        # Imported here so numpy stays off the cold-start path
+        from analytics.polyline import decode_polyline, route_features
+        features = route_features(decode_polyline(polyline))
+        if features is None:
+            return None
+        return {"shape": features.shape, "total_turning_deg": features.total_turning_deg}
+    raise ValueError(f"Unknown derived field: {name}")
+
+
+def project_activity(activity: StravaActivityBase, view: str = "title") -> Dict[str, Any]:
+    """Project an activity onto the compact field set for a use case"""
+    if view not in PROJECTION_FIELDS:
+        raise ValueError(f"Unknown projection '{view}'. Must be one of: {list(PROJECTIONS)}")
+    
+    projected: Dict[str, Any] = {}
+    for field in PROJECTION_FIELDS[view]:
+        value = getattr(activity, field)
+        if value is not None:
+            projected[field] = value
+    for field in PROJECTION_DERIVED[view]:
+        value = _derive(activity, field)
+        if value is not None:
+            projected[field] = value
+    return projected
+
+
+def to_compact_json(data: Dict[str, Any]) -> str:
+    """Serialize without whitespace for the model context"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def projection_savings(activity: StravaActivityBase, view: str = "title") -> Dict[str, float]:
+    """Compare the compact projection against the full pretty-printed dump"""
+    full_bytes = len(activity.model_dump_json(indent=2).encode("utf-8"))
+    compact_bytes = len(to_compact_json(project_activity(activity, view)).encode("utf-8"))
+    return {
+        "view": view,
+        "full_bytes": full_bytes,
+        "compact_bytes": compact_bytes,
+        "saved_bytes": full_bytes - compact_bytes,
+        "saved_ratio": round(1 - compact_bytes / full_bytes, 3) if full_bytes else 0.0,
+        "full_tokens_est": full_bytes // BYTES_PER_TOKEN,
+        "compact_tokens_est": compact_bytes // BYTES_PER_TOKEN,
+    }
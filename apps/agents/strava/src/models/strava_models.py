@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, computed_field
+from pydantic_core import from_json
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 
 
@@ -88,8 +89,8 @@ class StravaLap(BaseModel):
     split: int
 
 
-class StravaActivity(BaseModel):
-    """Complete Strava activity representation matching API v3"""
+class StravaActivityBase(BaseModel):
+    """Top-level Strava activity fields, without the large nested breakdowns"""
     # Core identification
     id: int
     resource_state: int
@@ -134,6 +135,7 @@ class StravaActivity(BaseModel):
     commute: bool
     manual: bool
     private: bool
+    visibility: Optional[str] = None  # everyone, followers_only, only_me
     flagged: bool
     gear_id: Optional[str] = None
     from_accepted_tag: Optional[bool] = None
@@ -164,15 +166,10 @@ class StravaActivity(BaseModel):
     segment_leaderboard_opt_out: bool = False
     leaderboard_opt_out: bool = False
 
-    # Detailed breakdowns
-    splits_metric: List[StravaSplitMetric] = []
-    laps: List[StravaLap] = []
+    # Gear and display settings
     gear: Optional[StravaGear] = None
     partner_brand_tag: Optional[str] = None
-    photos: Optional[StravaPhotos] = None
-    highlighted_kudosers: List[StravaKudoser] = []
     hide_from_home: bool = False
-    segment_efforts: List = []  # Simplified for now
 
     class Config:
         # Allow parsing datetime strings automatically
@@ -181,3 +178,102 @@ class StravaActivity(BaseModel):
         }
         # Allow population by field name or alias
         allow_population_by_field_name = True
+
+
+class StravaActivity(StravaActivityBase):
+    """Complete Strava activity representation matching API v3"""
+    # Detailed breakdowns
+    splits_metric: List[StravaSplitMetric] = []
+    laps: List[StravaLap] = []
+    photos: Optional[StravaPhotos] = None
+    highlighted_kudosers: List[StravaKudoser] = []
+    segment_efforts: List = []  # Simplified for now
+
+
+# Nested breakdowns that LazyStravaActivity validates on first access
+_NESTED_ADAPTERS: Dict[str, TypeAdapter] = {
+    "splits_metric": TypeAdapter(List[StravaSplitMetric]),
+    "laps": TypeAdapter(List[StravaLap]),
+    "photos": TypeAdapter(Optional[StravaPhotos]),
+    "highlighted_kudosers": TypeAdapter(List[StravaKudoser]),
+    "segment_efforts": TypeAdapter(List),
+}
+
+
+class LazyStravaActivity(StravaActivityBase):
+    """Strava activity that validates top-level fields eagerly and nested breakdowns on access.
+
+    Serializes to the same shape as StravaActivity; dumping it validates any
+    breakdowns that have not been accessed yet.
+    """
+    _raw_nested: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _parsed_nested: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "LazyStravaActivity":
+        """Build from a decoded API payload, holding nested breakdowns raw"""
+        activity = cls(**{key: value for key, value in data.items() if key not in _NESTED_ADAPTERS})
+        activity._raw_nested = {key: data[key] for key in _NESTED_ADAPTERS if data.get(key) is not None}
+        return activity
+
+    def _nested(self, name: str) -> Any:
+        if name not in self._parsed_nested:
+            raw = self._raw_nested.get(name)
+            if raw is None:
+                self._parsed_nested[name] = None if name == "photos" else []
+            else:
+                self._parsed_nested[name] = _NESTED_ADAPTERS[name].validate_python(raw)
+        return self._parsed_nested[name]
+
+    @computed_field
+    @property
+    def splits_metric(self) -> List[StravaSplitMetric]:
+        return self._nested("splits_metric")
+
+    @computed_field
+    @property
+    def laps(self) -> List[StravaLap]:
+        return self._nested("laps")
+
+    @computed_field
+    @property
+    def photos(self) -> Optional[StravaPhotos]:
+        return self._nested("photos")
+
+    @computed_field
+    @property
+    def highlighted_kudosers(self) -> List[StravaKudoser]:
+        return self._nested("highlighted_kudosers")
+
+    @computed_field
+    @property
+    def segment_efforts(self) -> List:
+        return self._nested("segment_efforts")
+
+
+_ACTIVITY_LIST_ADAPTER = TypeAdapter(List[StravaActivityBase])
+
+
+def parse_activity_list(data: Union[bytes, str, List[Dict[str, Any]]]) -> List[StravaActivityBase]:
+    """Parse a page of summary activities (e.g. GET /athlete/activities)"""
+    if isinstance(data, list):
+        return _ACTIVITY_LIST_ADAPTER.validate_python(data)
+    return _ACTIVITY_LIST_ADAPTER.validate_json(data)
+
+
+def parse_activity(
+    data: Union[bytes, str, Dict[str, Any]], lazy: bool = False
+) -> Union[StravaActivity, LazyStravaActivity]:
+    """Parse an activity from raw response bytes, JSON text or a decoded dict.
+
+    Eager parsing of bytes/text validates straight from JSON without
+    building an intermediate dict; lazy parsing decodes with pydantic-core's
+    JSON parser, which is faster than the stdlib json module.
+    """
+    if lazy:
+        if not isinstance(data, dict):
+            data = from_json(data)
+        return LazyStravaActivity.from_data(data)
+    if isinstance(data, dict):
+        return StravaActivity(**data)
+    return StravaActivity.model_validate_json(data)
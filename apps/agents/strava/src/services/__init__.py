@@ -0,0 +1,64 @@
+# Services package
+from .naming import suggest_creative_names
+from .title_engine import VOICES, TitleEngine, default_title_engine
+from .idempotency import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+    WebhookDeduplicator,
+    create_idempotency_store
+)
+from .agent_pool import AgentPool, AgentPoolSaturatedError
+from .latency import LatencyHistogram
+from .sms_chunker import SmsChunker, split_sms
+from .intents import Intent, FastPathStats, parse_intent
+from .tool_execution import tool_cancelled, with_timeout
+from .context_budget import ContextEstimate, HistoryBudget, estimate_tokens, history_tokens, select_tools
+from .session_store import (
+    SessionState,
+    SessionBackend,
+    SQLiteSessionBackend,
+    SessionStore,
+    create_session_store
+)
+
+__all__ = [
+    "suggest_creative_names",
+    "VOICES",
+    "TitleEngine",
+    "default_title_engine",
+    "IdempotencyStore",
+    "InMemoryIdempotencyStore",
+    "SQLiteIdempotencyStore",
+    "WebhookDeduplicator",
+    "create_idempotency_store",
+    "AgentPool",
+    "AgentPoolSaturatedError",
+    "LatencyHistogram",
+    "SmsChunker",
+    "split_sms",
+    "Intent",
+    "FastPathStats",
+    "parse_intent",
+    "with_timeout",
+    "tool_cancelled",
+    "SessionState",
+    "SessionBackend",
+    "SQLiteSessionBackend",
+    "SessionStore",
+    "create_session_store",
+    "ContextEstimate",
+    "HistoryBudget",
+    "estimate_tokens",
+    "history_tokens",
+    "select_tools",
+    "TokenBudgetConversationManager"
+]
+
+
+def __getattr__(name):
+    # The conversation manager subclasses a strands class, so strands is only imported on first use
+    if name == "TokenBudgetConversationManager":
+        from .budget_conversation_manager import TokenBudgetConversationManager
+        return TokenBudgetConversationManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,136 @@
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AgentPoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+    pass
+
+
+@dataclass
+class _SessionAgent:
+    agent: Any
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class AgentPool:
+    """Per-session agents run on a bounded executor.
+
+    Each SMS session gets its own agent, so conversation history never leaks
+    between users. Turns for the same session are serialized because an agent
+    can only run one turn at a time. At most `max_workers` turns run at once
+    and at most `max_queued` wait behind them; anything beyond that is rejected
+    with AgentPoolSaturatedError rather than piling up. Idle session agents
+    are evicted after `idle_ttl` seconds or once `max_sessions` is exceeded.
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_workers: int = 8,
+        max_queued: int = 16,
+        max_sessions: int = 256,
+        idle_ttl: float = 1800.0,
+    ):
+        self.factory = factory
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.rejected = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._admission = threading.BoundedSemaphore(max_workers + max_queued)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._sessions: "OrderedDict[str, _SessionAgent]" = OrderedDict()
+    
+    def run(self, session_id: Optional[str], turn: Callable[[Any], T], timeout: Optional[float] = None) -> T:
+        """Run `turn(agent)` with the session's agent on the executor and wait for its result"""
+        return self.submit(session_id, turn).result(timeout)
+    
+    def submit(self, session_id: Optional[str], turn: Callable[[Any], T]) -> "Future[T]":
+        """Schedule `turn(agent)` with the session's agent on the executor"""
+        if not self._admission.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise AgentPoolSaturatedError(
+                f"Agent pool saturated: {self.max_workers} running and {self.max_queued} queued"
+            )
+        
+        try:
+            # Copy the caller's context so per-request contextvars (priority, buffers) follow the turn
+            future = self._executor.submit(contextvars.copy_context().run, self._run_turn, session_id, turn)
+        except BaseException:
+            self._admission.release()
+            raise
+        # Release on completion rather than on return so a timed-out turn still holds its slot
+        future.add_done_callback(lambda _: self._admission.release())
+        return future
+    
+    def _run_turn(self, session_id: Optional[str], turn: Callable[[Any], T]) -> T:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if not session_id:
+                # No session to continue, so use a throwaway agent
+                return turn(self.factory())
+            entry = self._checkout(session_id)
+            with entry.lock:
+                entry.last_used = time.monotonic()
+                return turn(entry.agent)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def _checkout(self, session_id: str) -> _SessionAgent:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+                return entry
+        
+        # Build outside the lock; if another thread raced us, keep theirs
+        created = _SessionAgent(agent=self.factory())
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, created)
+            self._sessions.move_to_end(session_id)
+            self._evict_locked()
+            return entry
+    
+    def _evict_locked(self):
+        now = time.monotonic()
+        for session_id, entry in list(self._sessions.items()):
+            over_capacity = len(self._sessions) > self.max_sessions
+            idle = now - entry.last_used > self.idle_ttl
+            if (over_capacity or idle) and not entry.lock.locked():
+                del self._sessions[session_id]
+    
+    def forget(self, session_id: str):
+        """Drop a session's agent and its conversation history"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+    
+    @property
+    def saturated(self) -> bool:
+        return self._in_flight >= self.max_workers
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "in_flight": self._in_flight,
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "rejected": self.rejected,
+            }
+    
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
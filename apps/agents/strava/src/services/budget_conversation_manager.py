@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+from .context_budget import HistoryBudget
+
+if TYPE_CHECKING:
+    from strands import Agent
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """Strands conversation manager that keeps each agent's history under a token budget.
+
+    After every invocation old tool results are truncated and the oldest
+    turns folded into a short summary (see HistoryBudget); on a context
+    overflow at least one more turn is dropped before the model is retried.
+    """
+    
+    def __init__(self, budget: Optional[HistoryBudget] = None):
+        super().__init__()
+        self.budget = budget or HistoryBudget()
+    
+    def apply_management(self, agent: "Agent", **kwargs: Any) -> None:
+        count = len(agent.messages)
+        self.budget.apply(agent.messages)
+        self.removed_message_count += count - len(agent.messages)
+    
+    def reduce_context(self, agent: "Agent", e: Optional[Exception] = None, **kwargs: Any) -> None:
+        count = len(agent.messages)
+        # On overflow, the current turn's tool results are fair game too
+        saved = self.budget.compact_tool_results(agent.messages, keep_recent_turns=0) if e is not None else 0
+        if not saved:
+            saved = self.budget.trim(agent.messages, force=e is not None)
+        if not saved and e is not None:
+            raise ContextWindowOverflowException("Unable to trim conversation context!") from e
+        self.budget.last_saved_tokens += saved
+        self.removed_message_count += count - len(agent.messages)
+    
+    def get_state(self) -> Dict[str, Any]:
+        state = super().get_state()
+        state["summary_lines"] = list(self.budget.summary_lines)
+        return state
+    
+    def restore_from_session(self, state: Dict[str, Any]) -> None:
+        result = super().restore_from_session(state)
+        self.budget.summary_lines = list(state.get("summary_lines", []))
+        return result
@@ -0,0 +1,211 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from .intents import CHOOSE, RENAME, SET_PRIVACY, parse_intent
+
+# Bedrock has no local tokenizer for Nova; ~4 characters per token is close enough for budgeting
+CHARS_PER_TOKEN = 4
+
+NAMING_TOOLS = frozenset({"get_activity_details", "generate_creative_names", "update_activity_name"})
+PRIVACY_TOOLS = frozenset({"get_activity_details", "update_activity_privacy", "get_user_preferences"})
+ANALYTICS_TOOLS = frozenset({"get_activity_details", "get_activity_analytics"})
+HISTORY_TOOLS = frozenset({"get_recent_activities", "search_activities"})
+PREFERENCE_TOOLS = frozenset({"get_user_preferences"})
+
+# Keywords that route a free-form message to a tool group; a message can match several groups
+_TOOL_GROUP_PATTERNS = [
+    (NAMING_TOOLS, re.compile(r"\b(?:re)?nam(?:e|es|ed|ing)\b|\btitles?\b|\bcall (?:it|this)\b|\bsuggest|\bideas?\b|\bfunn|\bwalken\b|\bvoice\b", re.IGNORECASE)),
+    (PRIVACY_TOOLS, re.compile(r"\bprivate\b|\bpublic\b|\bprivacy\b|\bfollowers?\b|\bhide\b|\bvisib|\bonly me\b", re.IGNORECASE)),
+    (ANALYTICS_TOOLS, re.compile(r"\bpace\b|\bsplits?\b|\bheart|\bhr\b|\bzones?\b|\bfastest\b|\banaly|\bbest efforts?\b|\bnegative split|\bper (?:km|mile)\b", re.IGNORECASE)),
+    (HISTORY_TOOLS, re.compile(
+        r"\brecent\b|\blast (?:week|month|year|few|\w+ (?:rides|runs|activities|walks|hikes|swims|workouts))\b|"
+        r"\bthis (?:week|month|year)\b|\b(?:yesterday|today)'?s?\b|\blongest\b|\bhistory\b|\bcommutes?\b|\bsearch\b|"
+        r"\b(?:all|every|each|other|older|earlier|previous)\b|\bhow many\b|"
+        r"\b(?:rides|runs|activities|walks|hikes|swims|workouts|ones)\b",
+        re.IGNORECASE,
+    )),
+    (PREFERENCE_TOOLS, re.compile(r"\bpreferences?\b|\bsettings?\b|\bdefaults?\b|\bunits?\b", re.IGNORECASE)),
+]
+
+_INTENT_TOOLS = {CHOOSE: NAMING_TOOLS, RENAME: NAMING_TOOLS, SET_PRIVACY: PRIVACY_TOOLS}
+
+_TRUNCATED = "... [truncated "
+# Session/activity context tags the agent prepends to each prompt; left out of summaries
+_CONTEXT_TAGS_RE = re.compile(r"^(?:\[[^\]]*\]\s*)+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count for text sent to the model"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def content_tokens(block: Dict[str, Any]) -> int:
+    """Approximate tokens for one Bedrock Converse content block"""
+    if "text" in block:
+        return estimate_tokens(block["text"])
+    if "toolUse" in block:
+        tool_use = block["toolUse"]
+        return estimate_tokens(tool_use.get("name", "")) + estimate_tokens(json.dumps(tool_use.get("input", {})))
+    if "toolResult" in block:
+        return sum(
+            estimate_tokens(item["text"]) if "text" in item else estimate_tokens(json.dumps(item, default=str))
+            for item in block["toolResult"].get("content", [])
+        )
+    return estimate_tokens(json.dumps(block, default=str))
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return sum(content_tokens(block) for block in message.get("content", []))
+
+
+def history_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    return sum(message_tokens(message) for message in messages)
+
+
+def tool_spec_tokens(tool_spec: Dict[str, Any]) -> int:
+    return estimate_tokens(json.dumps(tool_spec))
+
+
+def select_tools(message: str) -> Optional[FrozenSet[str]]:
+    """Names of the tools a message can need, or None to expose every tool.
+
+    Uses the fast-path intent parser first and keyword groups otherwise.
+    Mentions of several activities or of the athlete's history add the
+    history tools to whatever else matched, and a message that matches
+    nothing gets the full tool set, so the model is never left without the
+    tool it needs.
+    """
+    intent = parse_intent(message)
+    if intent is not None:
+        return _INTENT_TOOLS[intent.action]
+    selected: FrozenSet[str] = frozenset()
+    for tools, pattern in _TOOL_GROUP_PATTERNS:
+        if pattern.search(message):
+            selected |= tools
+    return selected or None
+
+
+@dataclass
+class ContextEstimate:
+    """Estimated prompt tokens for one agent turn, and what budgeting kept out of it"""
+    system: int
+    tools: int
+    history: int
+    tools_saved: int = 0
+    history_saved: int = 0
+    
+    @property
+    def total(self) -> int:
+        return self.system + self.tools + self.history
+    
+    @property
+    def saved(self) -> int:
+        return self.tools_saved + self.history_saved
+
+
+class HistoryBudget:
+    """Keeps a Converse message history under a token budget.
+
+    Tool results older than the most recent `keep_recent_turns` turns are cut
+    to `max_tool_result_tokens` (full activity JSON is the usual offender; the
+    model can fetch it again). If the history is still over `max_tokens`, the
+    oldest whole turns are dropped and replaced by a short running summary
+    prepended to the first remaining user message.
+    """
+    
+    SUMMARY_MARKER = "[Earlier in this conversation]"
+    
+    def __init__(
+        self,
+        max_tokens: int = 3000,
+        max_tool_result_tokens: int = 300,
+        keep_recent_turns: int = 1,
+        summary_tokens: int = 150,
+    ):
+        self.max_tokens = max_tokens
+        self.max_tool_result_tokens = max_tool_result_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.summary_tokens = summary_tokens
+        self.summary_lines: List[str] = []
+        # Tokens removed by the most recent compaction and trim
+        self.last_saved_tokens = 0
+    
+    @staticmethod
+    def turn_starts(messages: List[Dict[str, Any]]) -> List[int]:
+        """Indices of user prompts, the only safe places to cut a history"""
+        return [
+            index for index, message in enumerate(messages)
+            if message["role"] == "user" and not any("toolResult" in block for block in message["content"])
+        ]
+    
+    def compact_tool_results(self, messages: List[Dict[str, Any]], keep_recent_turns: Optional[int] = None) -> int:
+        """Truncate large tool results outside the most recent turns; returns the tokens saved"""
+        keep = self.keep_recent_turns if keep_recent_turns is None else keep_recent_turns
+        starts = self.turn_starts(messages)
+        if len(starts) <= keep:
+            return 0
+        end = starts[-keep] if keep else len(messages)
+        limit = self.max_tool_result_tokens * CHARS_PER_TOKEN
+        saved = 0
+        for message in messages[:end]:
+            for block in message["content"]:
+                if "toolResult" not in block:
+                    continue
+                items = block["toolResult"].get("content", [])
+                for index, item in enumerate(items):
+                    text = item.get("text") if "text" in item else json.dumps(item.get("json"), default=str)
+                    if ("text" not in item and "json" not in item) or len(text) <= limit or _TRUNCATED in text:
+                        continue
+                    items[index] = {"text": f"{text[:limit]}{_TRUNCATED}{len(text) - limit} chars; fetch again if needed]"}
+                    saved += estimate_tokens(text) - estimate_tokens(items[index]["text"])
+        return saved
+    
+    def trim(self, messages: List[Dict[str, Any]], force: bool = False) -> int:
+        """Drop the oldest turns until the history fits, keeping the latest; returns the tokens saved.
+
+        With `force`, at least one turn is dropped even if the estimate says
+        the history fits (the model reported an overflow).
+        """
+        before = history_tokens(messages)
+        starts = self.turn_starts(messages)
+        total = before
+        cut = 0
+        for start in starts[1:]:
+            if total <= self.max_tokens and not (force and cut == 0):
+                break
+            total -= history_tokens(messages[cut:start])
+            cut = start
+        if cut == 0:
+            return 0
+        
+        self._summarize(messages[:cut])
+        del messages[:cut]
+        first = messages[0]["content"]
+        if self.summary_lines:
+            first.insert(0, {"text": f"{self.SUMMARY_MARKER} " + " ".join(self.summary_lines)})
+        return before - history_tokens(messages)
+    
+    def apply(self, messages: List[Dict[str, Any]]) -> int:
+        """Compact old tool results, then trim to the budget; returns the tokens saved"""
+        self.last_saved_tokens = self.compact_tool_results(messages)
+        if history_tokens(messages) > self.max_tokens:
+            self.last_saved_tokens += self.trim(messages)
+        return self.last_saved_tokens
+    
+    def _summarize(self, dropped: List[Dict[str, Any]]):
+        """Fold the dropped turns into one short line each"""
+        for message in dropped:
+            texts = [
+                block["text"] for block in message["content"]
+                if "text" in block and not block["text"].startswith(self.SUMMARY_MARKER)
+            ]
+            tools = [block["toolUse"]["name"] for block in message["content"] if "toolUse" in block]
+            if texts:
+                text = _CONTEXT_TAGS_RE.sub("", " ".join(" ".join(texts).split()))
+                self.summary_lines.append(f"{message['role']}: {text[:100]}{'...' if len(text) > 100 else ''}")
+            if tools:
+                self.summary_lines.append(f"assistant used {', '.join(tools)}.")
+        while self.summary_lines and estimate_tokens(" ".join(self.summary_lines)) > self.summary_tokens:
+            self.summary_lines.pop(0)
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+
+class IdempotencyStore(ABC):
+    """Abstract store of results for already-processed events"""
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored result for a key, or None if absent or expired"""
+        pass
+    
+    @abstractmethod
+    def put(self, key: str, result: str, ttl_seconds: float):
+        """Store a result for a key until ttl_seconds from now"""
+        pass
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Process-local idempotency store"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, str]] = {}
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            return result
+    
+    def put(self, key: str, result: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            # Purge expired entries opportunistically so the dict stays bounded
+            expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+            self._entries[key] = (now + ttl_seconds, result)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """SQLite-backed idempotency store that survives restarts and is shared by local workers"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency (expires_at)")
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM idempotency WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put(self, key: str, result: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO idempotency (key, result, expires_at) VALUES (?, ?, ?)",
+                (key, result, now + ttl_seconds),
+            )
+    
+    def close(self):
+        self._conn.close()
+
+
+def create_idempotency_store(backend: str = "memory", db_path: Optional[str] = None) -> IdempotencyStore:
+    """Factory for the configured idempotency backend"""
+    if backend == "sqlite":
+        return SQLiteIdempotencyStore(db_path or "metamatic_idempotency.db")
+    if backend == "memory":
+        return InMemoryIdempotencyStore()
+    raise ValueError(f"Unknown idempotency backend '{backend}'. Must be one of: ['memory', 'sqlite']")
+
+
+class WebhookDeduplicator:
+    """Coalesces duplicate webhook events into a single unit of work.
+
+    Results are stored for `window_seconds`; a duplicate arriving while the
+    first event is still being processed waits for it rather than redoing
+    the work. Failures are not stored, so a retried event runs again.
+    """
+    
+    def __init__(self, store: IdempotencyStore, window_seconds: float = 300.0):
+        self.store = store
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, threading.Event] = {}
+    
+    @staticmethod
+    def make_key(athlete_id: str, activity_id: str, event_type: str) -> str:
+        return f"{athlete_id}:{activity_id}:{event_type}"
+    
+    def run(self, key: str, work: Callable[[], str]) -> Tuple[str, bool]:
+        """Return (result, was_duplicate), running `work` only for the first event of a key"""
+        is_leader = False
+        while not is_leader:
+            cached = self.store.get(key)
+            if cached is not None:
+                return cached, True
+            
+            with self._lock:
+                event = self._in_flight.get(key)
+                is_leader = event is None
+                if is_leader:
+                    event = self._in_flight[key] = threading.Event()
+            
+            if not is_leader and not event.wait(self.window_seconds):
+                # The first delivery is stuck; stop waiting and do the work
+                break
+            # A follower whose leader failed loops to re-check the store and run the election again
+        
+        try:
+            if is_leader:
+                # A previous leader may have stored the result between our check and taking the lead
+                cached = self.store.get(key)
+                if cached is not None:
+                    return cached, True
+            result = work()
+            self.store.put(key, result, self.window_seconds)
+            return result, False
+        finally:
+            if is_leader:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                event.set()
@@ -0,0 +1,88 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .latency import LatencyHistogram
+
+CHOOSE = "choose"
+SET_PRIVACY = "set_privacy"
+RENAME = "rename"
+
+_FILLER = r"(?:please\s+|pls\s+|can you\s+|could you\s+)?"
+_TARGET = r"(?:it|this|that|this one|the activity|this activity|my activity|the run|the ride)"
+
+_CHOOSE_RE = re.compile(r"^\s*(?:#|no\.?\s*|option\s+|number\s+)?([1-9])\s*[.!)]?\s*$", re.IGNORECASE)
+_PRIVACY_RE = re.compile(
+    rf"^\s*{_FILLER}(?:(?:make|set|change|switch|mark)\s+(?:{_TARGET}\s+)?(?:to\s+|as\s+)?)?"
+    r"(private|public|followers[\s_-]*only|only\s+me|everyone)\s*(?:please)?\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+# Renames need an explicit "to"/"as" before the title and a single-activity target;
+# "call it a day", "name it after my dog" or "rename my last three rides to ..." go to the LLM
+_RENAME_RE = re.compile(
+    rf"^\s*{_FILLER}(?:(?:rename|call|name|title)\s+(?:{_TARGET}\s+)?(?:to|as)|"
+    rf"change\s+(?:the\s+)?(?:name|title)\s+(?:of\s+{_TARGET}\s+)?to)\s+[\"'“‘]?(.+?)[\"'”’]?\s*[.!]?\s*$",
+    re.IGNORECASE,
+)
+# Values that are references or requests rather than titles
+_NOT_A_TITLE_RE = re.compile(
+    r"^(?:it|this|that|them|these|those|one|me|something\b.*|anything\b.*|whatever\b.*|"
+    r"(?:a\s+)?(?:better|different|new|funn\w*|cool\w*|creative)\s+(?:one|name|title)s?)$|.*\?$",
+    re.IGNORECASE,
+)
+
+PRIVACY_ALIASES = {
+    "private": "private",
+    "only me": "private",
+    "public": "public",
+    "everyone": "public",
+    "followers only": "followers_only",
+}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """An unambiguous request parsed from an SMS reply"""
+    action: str
+    value: str
+
+
+def parse_intent(message: str) -> Optional[Intent]:
+    """Recognize the common replies (a suggestion number, a privacy change, a rename); None means ask the LLM"""
+    match = _CHOOSE_RE.match(message)
+    if match:
+        return Intent(CHOOSE, match.group(1))
+    
+    match = _PRIVACY_RE.match(message)
+    if match:
+        setting = re.sub(r"[\s_-]+", " ", match.group(1).lower())
+        return Intent(SET_PRIVACY, PRIVACY_ALIASES[setting])
+    
+    match = _RENAME_RE.match(message)
+    if match:
+        title = match.group(1).strip()
+        if title and not _NOT_A_TITLE_RE.match(title):
+            return Intent(RENAME, title)
+    return None
+
+
+class FastPathStats:
+    """Counts replies handled by the rule-based fast path versus the LLM, with latency percentiles for each"""
+    
+    PATHS = ("fast_path", "agent")
+    
+    def __init__(self, window: int = 1024):
+        self._latencies = {path: LatencyHistogram(window) for path in self.PATHS}
+    
+    def record(self, path: str, seconds: float):
+        self._latencies[path].record(seconds)
+    
+    def stats(self) -> Dict[str, object]:
+        total = sum(histogram.count for histogram in self._latencies.values())
+        result: Dict[str, object] = {
+            "total": total,
+            "fast_path_ratio": self._latencies["fast_path"].count / total if total else 0.0,
+        }
+        for path, histogram in self._latencies.items():
+            result[path] = {"count": histogram.count, "latency_ms": histogram.summary()}
+        return result
@@ -0,0 +1,32 @@
+import threading
+from collections import deque
+from typing import Dict
+
+from agent_utils import percentile
+
+
+class LatencyHistogram:
+    """Rolling window of latency samples with percentile summaries"""
+    
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds * 1000)
+    
+    def summary(self) -> Dict[str, float]:
+        """p50/p95/p99/max in milliseconds over the window; empty if nothing recorded"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {}
+        return {
+            "p50": round(percentile(samples, 50), 3),
+            "p95": round(percentile(samples, 95), 3),
+            "p99": round(percentile(samples, 99), 3),
+            "max": round(samples[-1], 3),
+        }
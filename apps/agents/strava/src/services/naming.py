@@ -0,0 +1,10 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from .title_engine import default_title_engine
+
+
+def suggest_creative_names(
+    details: Dict[str, Any], voice: Optional[str] = None, recent_titles: Iterable[str] = ()
+) -> List[str]:
+    """Generate three creative names from activity details (a projection or raw activity dict)"""
+    return default_title_engine.suggest(details, voice=voice, recent_titles=recent_titles, count=3)
@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class SessionState:
+    """What the user was last shown in an SMS session"""
+    session_id: str
+    activity_id: str
+    creative_names: List[str]
+    athlete_id: Optional[str] = None
+    updated_at: float = field(default_factory=time.time)
+    
+    def choice(self, reply: str) -> Optional[str]:
+        """The suggested name a numeric reply like "2" refers to, if any"""
+        reply = reply.strip().rstrip(".!)")
+        if reply.isdigit() and 1 <= int(reply) <= len(self.creative_names):
+            return self.creative_names[int(reply) - 1]
+        return None
+    
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+    
+    @classmethod
+    def from_json(cls, data: str) -> "SessionState":
+        return cls(**json.loads(data))
+
+
+class SessionBackend(ABC):
+    """Abstract durable storage for session state"""
+    
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[str]:
+        """Return the serialized state for a session, or None if absent or expired"""
+        pass
+    
+    @abstractmethod
+    def put(self, session_id: str, data: str, ttl_seconds: float):
+        """Store serialized state for a session until ttl_seconds from now"""
+        pass
+    
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget a session"""
+        pass
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite-backed session storage that survives restarts and is shared by local workers"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+    
+    def get(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put(self, session_id: str, data: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, data, now + ttl_seconds),
+            )
+    
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def close(self):
+        self._conn.close()
+
+
+class SessionStore:
+    """In-memory LRU of session state with a TTL, optionally backed by a durable store.
+
+    Reads check memory first and fall back to the backend (e.g. after a restart
+    or when another worker started the session); writes go to both.
+    """
+    
+    def __init__(self, backend: Optional[SessionBackend] = None, max_size: int = 1024, ttl_seconds: float = 86400):
+        self.backend = backend
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, SessionState]]" = OrderedDict()
+    
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                expires_at, state = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(session_id)
+                    return state
+                del self._entries[session_id]
+        
+        if self.backend is None:
+            return None
+        data = self.backend.get(session_id)
+        if data is None:
+            return None
+        state = SessionState.from_json(data)
+        # Expire with the stored row rather than restarting the TTL on every cache miss
+        self._remember(state, state.updated_at + self.ttl_seconds)
+        return state
+    
+    def put(self, state: SessionState):
+        state.updated_at = time.time()
+        self._remember(state, state.updated_at + self.ttl_seconds)
+        if self.backend is not None:
+            self.backend.put(state.session_id, state.to_json(), self.ttl_seconds)
+    
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+    
+    def _remember(self, state: SessionState, expires_at: float):
+        with self._lock:
+            self._entries[state.session_id] = (expires_at, state)
+            self._entries.move_to_end(state.session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_session_store(
+    backend: str = "memory",
+    db_path: Optional[str] = None,
+    max_size: int = 1024,
+    ttl_seconds: float = 86400,
+) -> SessionStore:
+    """Factory for a session store with the configured durable backend"""
+    if backend == "sqlite":
+        return SessionStore(SQLiteSessionBackend(db_path or "metamatic_sessions.db"), max_size, ttl_seconds)
+    if backend == "memory":
+        return SessionStore(None, max_size, ttl_seconds)
+    raise ValueError(f"Unknown session backend '{backend}'. Must be one of: ['memory', 'sqlite']")
@@ -0,0 +1,66 @@
+import re
+from typing import List
+
+SINGLE_SMS_LIMIT = 160
+# A concatenated SMS loses 7 characters per part to the reassembly header
+MULTIPART_SMS_LIMIT = 153
+
+_SENTENCE_END = re.compile(r"[.!?\n]\s")
+
+
+class SmsChunker:
+    """Turns streamed text into SMS-sized segments as soon as each one is complete.
+
+    A reply that fits in one message is sent as a single 160-character SMS.
+    Once the text grows past that, it is split into 153-character parts,
+    broken at a sentence end where possible, otherwise at a space. Sizes
+    count characters and assume the GSM-7 alphabet.
+    """
+    
+    def __init__(self, single_limit: int = SINGLE_SMS_LIMIT, part_limit: int = MULTIPART_SMS_LIMIT):
+        self.single_limit = single_limit
+        self.part_limit = part_limit
+        self._buffer = ""
+        self._multipart = False
+    
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text, returning any segments that are now complete"""
+        self._buffer += text
+        if not self._multipart and len(self._buffer) <= self.single_limit:
+            return []
+        self._multipart = True
+        
+        segments = []
+        # Hold back the last part: more text may still arrive to fill it
+        while len(self._buffer) > self.part_limit:
+            segments.append(self._cut())
+        return [segment for segment in segments if segment]
+    
+    def close(self) -> List[str]:
+        """Flush whatever remains at the end of the stream"""
+        segments = []
+        limit = self.part_limit if self._multipart else self.single_limit
+        while len(self._buffer) > limit:
+            segments.append(self._cut())
+        segments.append(self._buffer.strip())
+        self._buffer = ""
+        return [segment for segment in segments if segment]
+    
+    def _cut(self) -> str:
+        window = self._buffer[:self.part_limit + 1]
+        boundaries = [match.end() - 1 for match in _SENTENCE_END.finditer(window)]
+        # Only break at a sentence end that leaves a reasonably full part
+        if boundaries and boundaries[-1] >= self.part_limit // 2:
+            split = boundaries[-1]
+        else:
+            split = window.rfind(" ")
+            if split <= 0:
+                split = self.part_limit
+        segment, self._buffer = self._buffer[:split], self._buffer[split:].lstrip()
+        return segment.strip()
+
+
+def split_sms(text: str) -> List[str]:
+    """Split a complete reply into SMS segments"""
+    chunker = SmsChunker()
+    return chunker.feed(text) + chunker.close()
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Matches the voice ids offered on the web dashboard
+VOICES = ("data-driven", "funny-witty", "christopher-walken")
+DEFAULT_VOICE = "funny-witty"
+
+FOOT_SPORTS = {"run", "trailrun", "virtualrun", "walk", "hike"}
+RIDE_SPORTS = {"ride", "cycling", "virtualride", "ebikeride", "gravelride", "mountainbikeride"}
+
+# Phrases exposed as template fields only when the route has that shape
+ROUTE_SHAPE_FIELDS = {
+    "loop": "Full Circle",
+    "out_and_back": "There and Back",
+    "point_to_point": "A to B",
+}
+
+# Candidate templates per sport group and voice, most specific first. A template
+# is only used when every field it references is known for the activity.
+TEMPLATE_TABLES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "foot": {
+        "data-driven": (
+            "{distance}K {sport} at {pace}/km",
+            "{distance}K {negative_split}",
+            "{distance}K with {elevation}m of Climbing",
+            "{weekday} {time_of_day} {distance}K",
+            "{distance}K {sport} in {city}",
+        ),
+        "funny-witty": (
+            "{time_of_day} Miles in {city}",
+            "{negative_split}, Positive Vibes",
+            "{distance}K Rhythm & Flow",
+            "{loop} {sport}",
+            "{out_and_back} {sport}",
+            "{point_to_point} {sport}",
+            "Pavement Poetry Session",
+            "{weekday} Sole Searching",
+        ),
+        "christopher-walken": (
+            "I Ran. {distance}K. In {city}.",
+            "{negative_split}... Fascinating.",
+            "The {sport}... It Was... {distance}K.",
+            "{time_of_day} {sport}... Needs More Cowbell.",
+            "{weekday}. {sport}. Wow.",
+        ),
+    },
+    "ride": {
+        "data-driven": (
+            "{distance}K {sport} at {speed} km/h",
+            "{distance}K with {elevation}m of Climbing",
+            "{weekday} {time_of_day} {distance}K Spin",
+            "{distance}K {sport} in {city}",
+        ),
+        "funny-witty": (
+            "Spinning Through {city}",
+            "{distance}K Pedal Power",
+            "{loop} {sport}",
+            "{out_and_back} {sport}",
+            "{point_to_point} {sport}",
+            "Two-Wheel Therapy",
+            "Wind & Wheels Journey",
+        ),
+        "christopher-walken": (
+            "The Bike... Took Me... {distance}K.",
+            "{city}. On Two Wheels. Incredible.",
+            "{time_of_day} {sport}... More Cowbell.",
+            "{weekday}. {sport}. Wow.",
+        ),
+    },
+    "other": {
+        "data-driven": (
+            "{distance}K {sport}",
+            "{sport} with {elevation}m of Climbing",
+            "{weekday} {time_of_day} {sport}",
+            "{sport} in {city}",
+        ),
+        "funny-witty": (
+            "Epic {sport} Adventure",
+            "{distance}K Challenge Conquered",
+            "Personal Victory Lap",
+            "{time_of_day} {sport} Shenanigans",
+        ),
+        "christopher-walken": (
+            "{sport}... You Know... I Did It.",
+            "{distance}K. Of {sport}. Wow.",
+            "{weekday}. {sport}. Fascinating.",
+        ),
+    },
+}
+
+# Appended to every table so there are always enough candidates
+FALLBACK_TEMPLATES = ("{time_of_day} {sport}", "{weekday} {sport}", "{sport} Session", "Another Great {sport}")
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template pre-parsed into its render function and required fields"""
+    render: Callable[..., str]
+    fields: FrozenSet[str]
+
+
+def _compile(template: str) -> CompiledTemplate:
+    fields = frozenset(name for _, name, _, _ in Formatter().parse(template) if name)
+    return CompiledTemplate(render=template.format_map, fields=fields)
+
+
+COMPILED_TABLES: Dict[str, Dict[str, Tuple[CompiledTemplate, ...]]] = {
+    group: {
+        voice: tuple(_compile(t) for t in templates + FALLBACK_TEMPLATES)
+        for voice, templates in voices.items()
+    }
+    for group, voices in TEMPLATE_TABLES.items()
+}
+
+
+def title_features(details: Dict[str, Any]) -> Dict[str, str]:
+    """Extract the template fields available for an activity (a projection or raw activity dict)"""
+    sport = str(details.get("type") or details.get("sport_type") or "Activity")
+    features = {"sport": sport[:1].upper() + sport[1:]}
+    
+    distance = details.get("distance_km")
+    if distance is None and details.get("distance"):
+        distance = round(float(details["distance"]) / 1000, 1)
+    if distance:
+        features["distance"] = f"{distance:g}"
+    
+    location = details.get("location") or details.get("location_city")
+    if location:
+        features["city"] = str(location).split(",")[0].strip()
+    if details.get("time_of_day"):
+        features["time_of_day"] = str(details["time_of_day"]).title()
+    if details.get("weekday"):
+        features["weekday"] = str(details["weekday"])
+    
+    pace = details.get("pace") or {}
+    if pace.get("per_km"):
+        features["pace"] = pace["per_km"]
+    speed = details.get("speed") or {}
+    if speed.get("kmh"):
+        features["speed"] = f"{speed['kmh']:g}"
+    
+    elevation = details.get("total_elevation_gain") or 0
+    if elevation >= 50:
+        features["elevation"] = str(int(round(elevation)))
+    
+    shape = (details.get("route") or {}).get("shape")
+    if shape in ROUTE_SHAPE_FIELDS:
+        features[shape] = ROUTE_SHAPE_FIELDS[shape]
+    if (details.get("splits") or {}).get("negative_split"):
+        features["negative_split"] = "Negative Split"
+    return features
+
+
+def _sport_group(sport: str) -> str:
+    sport = sport.lower()
+    if sport in FOOT_SPORTS:
+        return "foot"
+    if sport in RIDE_SPORTS:
+        return "ride"
+    return "other"
+
+
+class TitleEngine:
+    """Template-based title generator with a content-addressed memo cache.
+
+    Candidates are memoized by a hash of the activity's title features and the
+    voice, so retries and duplicate webhooks reuse earlier work. De-duplication
+    against the athlete's recent titles is applied per call on top of the
+    memoized candidate list.
+    """
+    
+    def __init__(self, memo_size: int = 1024):
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+    
+    @staticmethod
+    def memo_key(features: Dict[str, str], voice: str) -> str:
+        payload = json.dumps({"features": features, "voice": voice}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def candidates(self, features: Dict[str, str], voice: str) -> Tuple[str, ...]:
+        """Every renderable title for these features, in priority order"""
+        key = self.memo_key(features, voice)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        
+        table = COMPILED_TABLES[_sport_group(features["sport"])][voice]
+        available = features.keys()
+        rendered = tuple(dict.fromkeys(
+            template.render(features) for template in table if template.fields <= available
+        ))
+        
+        with self._lock:
+            self._memo[key] = rendered
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return rendered
+    
+    def suggest(
+        self,
+        details: Dict[str, Any],
+        voice: Optional[str] = None,
+        recent_titles: Iterable[str] = (),
+        count: int = 3,
+    ) -> List[str]:
+        """Top `count` titles for an activity, skipping titles the athlete has used recently"""
+        voice = voice if voice in VOICES else DEFAULT_VOICE
+        candidates = self.candidates(title_features(details), voice)
+        
+        used = {title.casefold() for title in recent_titles}
+        fresh = [title for title in candidates if title.casefold() not in used]
+        # Fall back to repeats rather than returning fewer than requested
+        return (fresh + [title for title in candidates if title not in fresh])[:count]
+    
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._memo),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+default_title_engine = TitleEngine()
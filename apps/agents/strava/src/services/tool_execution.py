@@ -0,0 +1,47 @@
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_cancelled: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "tool_call_cancelled", default=None
+)
+
+
+def tool_cancelled() -> bool:
+    """True inside a tool call that has already timed out, whose result will be discarded"""
+    event = _cancelled.get()
+    return event is not None and event.is_set()
+
+
+def with_timeout(function: Callable[..., str], timeout_seconds: float, executor: Optional[Executor] = None):
+    """Wrap a blocking tool as a coroutine that runs on `executor` and gives up after `timeout_seconds`.
+
+    The agent runs tool calls from one model turn concurrently, so independent
+    Strava calls overlap instead of queueing. A call that times out returns a
+    JSON error for the model to report; the worker thread is left to finish
+    in the background, and tool_cancelled() tells it not to make changes the
+    model was told failed.
+    """
+    @functools.wraps(function)
+    async def run(*args, **kwargs) -> str:
+        loop = asyncio.get_running_loop()
+        # Carry contextvars (request priority, mutation buffer) into the worker thread
+        context = contextvars.copy_context()
+        cancelled = threading.Event()
+        context.run(_cancelled.set, cancelled)
+        call = functools.partial(context.run, function, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout_seconds)
+        except asyncio.TimeoutError:
+            cancelled.set()
+            logger.warning("Tool %s timed out after %ss", function.__name__, timeout_seconds)
+            return json.dumps({"error": f"{function.__name__} timed out after {timeout_seconds:g}s"})
+    
+    return run
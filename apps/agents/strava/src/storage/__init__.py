@@ -0,0 +1,4 @@
+# Storage package
+from .activity_store import ActivityStore
+
+__all__ = ["ActivityStore"]
@@ -0,0 +1,252 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from clients.strava_client import StravaClientInterface
+from models.strava_models import StravaActivityBase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    sport_type TEXT NOT NULL,
+    distance REAL NOT NULL,
+    moving_time INTEGER NOT NULL,
+    total_elevation_gain REAL NOT NULL,
+    start_date INTEGER NOT NULL,
+    start_date_local TEXT NOT NULL,
+    commute INTEGER NOT NULL,
+    private INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_activities_athlete_start ON activities (athlete_id, start_date);
+CREATE INDEX IF NOT EXISTS idx_activities_sport_type ON activities (athlete_id, sport_type COLLATE NOCASE, start_date);
+CREATE INDEX IF NOT EXISTS idx_activities_distance ON activities (athlete_id, distance);
+CREATE TABLE IF NOT EXISTS sync_state (
+    athlete_id INTEGER PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    synced_through INTEGER
+);
+"""
+
+SUMMARY_COLUMNS = "id, name, type, sport_type, distance, moving_time, total_elevation_gain, start_date_local, commute, private"
+
+ORDER_BY = {
+    "start_date": "start_date DESC",
+    "distance": "distance DESC",
+    "moving_time": "moving_time DESC",
+    "elevation": "total_elevation_gain DESC",
+}
+
+# sync_state key used when activities are synced without a known athlete id
+ALL_ATHLETES = 0
+
+
+def _to_epoch(value: datetime) -> int:
+    return int(value.timestamp())
+
+
+class ActivityStore:
+    """SQLite-backed local copy of athletes' activities for fast history queries.
+
+    Fed incrementally from GET /athlete/activities: each sync only asks
+    Strava for activities that started after the newest one seen by the last
+    completed sync. That watermark lives in sync_state and is never derived
+    from rows written by other paths (write-through updates, backfills).
+    """
+    
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sync_state)")}
+        if "synced_through" not in columns:
+            self._conn.execute("ALTER TABLE sync_state ADD COLUMN synced_through INTEGER")
+    
+    def upsert_many(self, activities: Iterable[StravaActivityBase]) -> int:
+        """Insert or replace activities; returns the number written"""
+        rows = [
+            (
+                activity.id,
+                activity.athlete.id,
+                activity.name,
+                activity.type,
+                activity.sport_type,
+                activity.distance,
+                activity.moving_time,
+                activity.total_elevation_gain,
+                _to_epoch(activity.start_date),
+                activity.start_date_local.strftime("%Y-%m-%dT%H:%M:%S"),
+                int(activity.commute),
+                int(activity.private),
+                StravaActivityBase.model_validate(activity, from_attributes=True).model_dump_json(by_alias=True),
+            )
+            for activity in activities
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO activities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+        return len(rows)
+    
+    def latest_start(self, athlete_id: Optional[int] = None) -> Optional[int]:
+        """Epoch start time of the newest stored activity"""
+        query, params = "SELECT MAX(start_date) FROM activities", ()
+        if athlete_id is not None:
+            query, params = query + " WHERE athlete_id = ?", (athlete_id,)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+    
+    def sync_watermark(self, athlete_id: Optional[int] = None) -> Optional[int]:
+        """Epoch start time of the newest activity seen by a completed sync"""
+        key = ALL_ATHLETES if athlete_id is None else athlete_id
+        with self._lock:
+            row = self._conn.execute("SELECT synced_through FROM sync_state WHERE athlete_id = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def seconds_since_sync(self, athlete_id: Optional[int] = None) -> Optional[float]:
+        key = ALL_ATHLETES if athlete_id is None else athlete_id
+        with self._lock:
+            row = self._conn.execute("SELECT synced_at FROM sync_state WHERE athlete_id = ?", (key,)).fetchone()
+        return time.time() - row[0] if row else None
+    
+    def sync(
+        self,
+        client: StravaClientInterface,
+        athlete_id: Optional[int] = None,
+        per_page: int = 100,
+        max_pages: Optional[int] = None,
+    ) -> int:
+        """Pull activities newer than the last completed sync; returns the number stored.
+        
+        The watermark only advances once a pass has listed every page, so a
+        pass cut short by max_pages is picked up from the same point next time.
+        """
+        after = self.sync_watermark(athlete_id)
+        newest = after
+        stored = 0
+        page = 1
+        complete = False
+        while max_pages is None or page <= max_pages:
+            activities = client.list_athlete_activities(after=after, page=page, per_page=per_page)
+            stored += self.upsert_many(activities)
+            for activity in activities:
+                newest = max(newest or 0, _to_epoch(activity.start_date))
+            if len(activities) < per_page:
+                complete = True
+                break
+            page += 1
+        
+        key = ALL_ATHLETES if athlete_id is None else athlete_id
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sync_state (athlete_id, synced_at, synced_through) VALUES (?, ?, ?) "
+                "ON CONFLICT (athlete_id) DO UPDATE SET synced_at = excluded.synced_at, "
+                "synced_through = CASE WHEN ? THEN excluded.synced_through ELSE synced_through END",
+                (key, time.time(), newest if complete else after, int(complete)),
+            )
+        return stored
+    
+    def sync_if_stale(self, client: StravaClientInterface, max_age_seconds: float, athlete_id: Optional[int] = None) -> int:
+        """Sync only if the last sync is older than max_age_seconds"""
+        age = self.seconds_since_sync(athlete_id)
+        if age is not None and age < max_age_seconds:
+            return 0
+        return self.sync(client, athlete_id)
+    
+    def get(self, activity_id: int) -> Optional[StravaActivityBase]:
+        """Stored copy of one activity"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM activities WHERE id = ?", (activity_id,)).fetchone()
+        return StravaActivityBase.model_validate_json(row["data"]) if row else None
+    
+    def find(
+        self,
+        athlete_id: Optional[int] = None,
+        sport_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        commute: Optional[bool] = None,
+        min_distance: Optional[float] = None,
+        name_contains: Optional[str] = None,
+        order_by: str = "start_date",
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Query stored activities as compact summaries"""
+        if order_by not in ORDER_BY:
+            raise ValueError(f"Invalid order_by '{order_by}'. Must be one of: {list(ORDER_BY)}")
+        
+        clauses, params = [], []
+        if athlete_id is not None:
+            clauses.append("athlete_id = ?")
+            params.append(athlete_id)
+        if sport_type:
+            clauses.append("sport_type = ? COLLATE NOCASE")
+            params.append(sport_type)
+        if since is not None:
+            clauses.append("start_date >= ?")
+            params.append(_to_epoch(since))
+        if until is not None:
+            clauses.append("start_date < ?")
+            params.append(_to_epoch(until))
+        if commute is not None:
+            clauses.append("commute = ?")
+            params.append(int(commute))
+        if min_distance is not None:
+            clauses.append("distance >= ?")
+            params.append(min_distance)
+        if name_contains:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name_contains}%")
+        
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT {SUMMARY_COLUMNS} FROM activities{where} ORDER BY {ORDER_BY[order_by]} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._summarize(row) for row in rows]
+    
+    def recent(self, athlete_id: Optional[int] = None, limit: int = 5, sport_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest activities first"""
+        return self.find(athlete_id=athlete_id, sport_type=sport_type, limit=limit)
+    
+    def longest(
+        self, athlete_id: Optional[int] = None, sport_type: Optional[str] = None, since: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Longest activity by distance"""
+        matches = self.find(athlete_id=athlete_id, sport_type=sport_type, since=since, order_by="distance", limit=1)
+        return matches[0] if matches else None
+    
+    def count(self, athlete_id: Optional[int] = None) -> int:
+        query, params = "SELECT COUNT(*) FROM activities", ()
+        if athlete_id is not None:
+            query, params = query + " WHERE athlete_id = ?", (athlete_id,)
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()[0]
+    
+    @staticmethod
+    def _summarize(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "type": row["type"],
+            "sport_type": row["sport_type"],
+            "distance_km": round(row["distance"] / 1000, 2),
+            "moving_time": row["moving_time"],
+            "total_elevation_gain": row["total_elevation_gain"],
+            "start_date_local": row["start_date_local"],
+            "commute": bool(row["commute"]),
+            "private": bool(row["private"]),
+        }
+    
+    def close(self):
+        self._conn.close()
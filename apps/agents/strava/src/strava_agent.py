@@ -1,36 +1,98 @@
+import asyncio
 import json
+import logging
 import os
-from datetime import datetime
-from strands import Agent, tool
-from strands.models import BedrockModel
-from bedrock_agentcore import BedrockAgentCoreApp
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterator, Optional
+from bedrock_agentcore import BedrockAgentCoreApp, PingStatus
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
 
-from clients.strava_client import StravaClientInterface, StravaClient, MockStravaClient
-from models.strava_models import StravaActivity
+from clients.strava_client import StravaClientInterface, MockStravaClient
+from clients.client_registry import StravaClientRegistry
+from clients.cached_client import ActivityCache, CachedStravaClient
+from clients.rate_limiter import RequestPriority, default_rate_limiter
+from clients.mutation_buffer import ActivityMutationBuffer, PRIVACY_TO_VISIBILITY
+from models.strava_models import StravaActivity, parse_activity
+from models.activity_projection import PROJECTIONS, project_activity, projection_savings, to_compact_json
+from services.naming import suggest_creative_names
+from services.idempotency import WebhookDeduplicator, create_idempotency_store
+from services.session_store import SessionState, create_session_store
+from services.agent_pool import AgentPool, AgentPoolSaturatedError
+from services.tool_execution import tool_cancelled, with_timeout
+from services.latency import LatencyHistogram
+from services.sms_chunker import SmsChunker, split_sms
+from services.intents import CHOOSE, RENAME, SET_PRIVACY, FastPathStats, parse_intent
+from services.context_budget import ContextEstimate, HistoryBudget, estimate_tokens, history_tokens, select_tools, tool_spec_tokens
+from workflows.new_activity import NewActivityPipeline
+from storage.activity_store import ActivityStore
+from telemetry import COUNT_BUCKETS, TOKEN_BUCKETS, telemetry
 from agent_utils import initialize_env
 
+if TYPE_CHECKING:
+    from strands import Agent
+
 initialize_env()
 
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+logger = logging.getLogger(__name__)
+
 SYSTEM_PROMPT = """
 You are MetaMatic, a helpful and creative assistant for the Strava fitness app.
 Your primary job is to help users manage their activities by renaming them or changing their settings.
 When a user provides a number, assume they are choosing one of the suggested titles.
 When a user makes a request in natural language, determine their intent and use the correct tool to help them.
+When a message asks for several things at once, call all of the needed tools together in the same turn.
 You are conversational, but efficient.
 """
 
 
+# Process-wide registry so tool calls and invocations reuse warm clients
+client_registry = StravaClientRegistry(
+    pool_size=int(os.getenv('STRAVA_POOL_SIZE', '10')),
+    idle_timeout=float(os.getenv('STRAVA_CLIENT_IDLE_TIMEOUT', '300')),
+    lazy_parsing=os.getenv('STRAVA_LAZY_PARSING', 'false').lower() == 'true',
+)
+
+# Shared activity cache so the new-activity flow and follow-up replies don't refetch
+activity_cache = ActivityCache(
+    max_size=int(os.getenv('ACTIVITY_CACHE_SIZE', '256')),
+    ttl_seconds=float(os.getenv('ACTIVITY_CACHE_TTL', '300')),
+)
+
+
+# Local copy of activity history so history questions don't page through Strava
+activity_store = ActivityStore(os.getenv('ACTIVITY_STORE_PATH', '/tmp/metamatic_activities.db'))
+ACTIVITY_STORE_SYNC_INTERVAL = float(os.getenv('ACTIVITY_STORE_SYNC_INTERVAL', '60'))
+
+# Spans and metrics are no-ops unless enabled; when on, /metrics serves them in Prometheus format
+telemetry.enabled = os.getenv('TELEMETRY_ENABLED', 'false').lower() == 'true'
+
+
 def create_strava_client() -> StravaClientInterface:
-    """Factory function to create the appropriate Strava client based on configuration"""
+    """Factory function to get the appropriate pooled, cached Strava client based on configuration"""
     if os.getenv('STRAVA_CLIENT_MODE', 'mock') == 'mock':
-        return MockStravaClient()
+        client = client_registry.get_mock_client()
     else:   
-        return StravaClient(os.getenv('STRAVA_ACCESS_TOKEN', ''))
+        client = client_registry.get_client(os.getenv('STRAVA_ACCESS_TOKEN', ''))
+    return CachedStravaClient(client, cache=activity_cache)
+
 
+@telemetry.traced("tool")
+def get_activity_details(activity_id: str, session_id: str, view: str = "title") -> str:
+    """Fetch details for a specific Strava activity as compact JSON.
 
-@tool
-def get_activity_details(activity_id: str, session_id: str) -> str:
-    """Fetch details for a specific Strava activity with comprehensive schema matching Strava API v3"""
+    Args:
+        activity_id: The Strava activity id
+        session_id: The current session id
+        view: Which fields to return: "title" (for naming), "privacy" (for visibility changes),
+            "summary" (for describing the activity) or "full" (the complete Strava API v3 record)
+    """
     try:
         # Create the appropriate Strava client based on configuration
         strava_client = create_strava_client()
@@ -38,55 +100,61 @@ def get_activity_details(activity_id: str, session_id: str) -> str:
         # Get activity details using the client
         activity = strava_client.get_activity_details(activity_id)
         
-        # Convert to JSON string for the LLM
-        return activity.model_dump_json(indent=2)
+        # Convert to a compact JSON string for the LLM
+        if view == "full":
+            return activity.model_dump_json()
+        if view not in PROJECTIONS:
+            view = "title"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Activity projection savings: %s", projection_savings(activity, view))
+        with telemetry.span("serialize", view=view):
+            return to_compact_json(project_activity(activity, view))
     except Exception as e:
         return json.dumps({"error": f"Failed to fetch activity details: {str(e)}"})
 
-@tool
-def generate_creative_names(activity_details: str) -> str:
-    """Generate three creative names for a Strava activity based on its details"""
+@telemetry.traced("tool")
+def generate_creative_names(activity_details: str, voice: str = "") -> str:
+    """Generate three creative names for a Strava activity based on its details.
+    
+    voice is optional: "data-driven", "funny-witty" (default) or "christopher-walken".
+    """
     try:
         details = json.loads(activity_details)
-        activity_type = details.get("type", "Activity").lower()
-        distance = details.get("distance", 0)
-        location = details.get("location", "")
-        
-        # Generate creative names based on activity details
-        creative_names = []
-        
-        if activity_type == "run":
-            creative_names = [
-                f"Morning Miles in {location}" if location else "Dawn Dash Adventure",
-                f"{distance}K Rhythm & Flow",
-                "Pavement Poetry Session"
-            ]
-        elif activity_type == "ride" or activity_type == "cycling":
-            creative_names = [
-                f"Spinning Through {location}" if location else "Wind & Wheels Journey",
-                f"{distance}K Pedal Power",
-                "Two-Wheel Therapy"
-            ]
-        else:
-            creative_names = [
-                f"Epic {activity_type} Adventure",
-                f"{distance}K Challenge Conquered",
-                "Personal Victory Lap"
-            ]
+        creative_names = suggest_creative_names(details, voice=voice or None)
         
         return json.dumps({"creative_names": creative_names})
     except Exception as e:
         return json.dumps({"error": f"Failed to generate creative names: {str(e)}"})
 
-@tool
+def _write_activity_update(activity_id: str, **fields) -> bool:
+    """Stage changes in the current agent turn's buffer, or write them now outside a turn.
+
+    Returns True if the change was staged for the end-of-turn flush.
+    """
+    if tool_cancelled():
+        # The model was already told this call timed out; don't apply the change behind its back
+        logger.warning("Dropped update to activity %s from a timed-out tool call", activity_id)
+        raise Exception("Tool call timed out before the change was saved")
+    buffer = ActivityMutationBuffer.current()
+    if buffer is not None:
+        buffer.stage(activity_id, **fields)
+        return True
+    activity = create_strava_client().update_activity(activity_id, fields)
+    activity_store.upsert_many([activity])
+    return False
+
+
+@telemetry.traced("tool")
 def update_activity_name(activity_id: str, new_name: str, session_id: str) -> str:
     """Update the name of a Strava activity"""
     try:
-        # Mock implementation - replace with actual Strava API call
+        cached = activity_cache.get(activity_id)
+        _write_activity_update(activity_id, name=new_name)
+        
         result = {
             "success": True,
             "activity_id": activity_id,
-            "old_name": "Morning Run",
+            "old_name": cached.name if cached else None,
             "new_name": new_name,
             "message": f"Activity renamed to '{new_name}'"
         }
@@ -94,7 +162,7 @@ def update_activity_name(activity_id: str, new_name: str, session_id: str) -> st
     except Exception as e:
         return json.dumps({"error": f"Failed to update activity name: {str(e)}"})
 
-@tool
+@telemetry.traced("tool")
 def update_activity_privacy(activity_id: str, privacy_setting: str, session_id: str) -> str:
     """Update the privacy setting of a Strava activity"""
     try:
@@ -102,7 +170,8 @@ def update_activity_privacy(activity_id: str, privacy_setting: str, session_id:
         if privacy_setting.lower() not in valid_settings:
             return json.dumps({"error": f"Invalid privacy setting. Must be one of: {valid_settings}"})
         
-        # Mock implementation - replace with actual Strava API call
+        _write_activity_update(activity_id, visibility=PRIVACY_TO_VISIBILITY[privacy_setting.lower()])
+        
         result = {
             "success": True,
             "activity_id": activity_id,
@@ -113,26 +182,78 @@ def update_activity_privacy(activity_id: str, privacy_setting: str, session_id:
     except Exception as e:
         return json.dumps({"error": f"Failed to update activity privacy: {str(e)}"})
 
-@tool
+@telemetry.traced("tool")
+def get_activity_analytics(activity_id: str, session_id: str) -> str:
+    """Analyze a Strava activity's streams: best efforts, per-km splits (fastest km, negative split), heart-rate zones"""
+    try:
+        from analytics.streams import summarize_streams
+        
+        strava_client = create_strava_client()
+        streams = strava_client.get_activity_streams(activity_id)
+        activity = strava_client.get_activity_details(activity_id)
+        summary = summarize_streams(streams, max_hr=activity.max_heartrate)
+        return to_compact_json({"activity_id": activity_id, **summary})
+    except Exception as e:
+        return json.dumps({"error": f"Failed to analyze activity: {str(e)}"})
+
+@telemetry.traced("tool")
 def get_recent_activities(session_id: str, limit: int = 5) -> str:
     """Get user's recent Strava activities"""
     try:
-        # Mock implementation - replace with actual Strava API call
-        activities = []
-        for i in range(limit):
-            activities.append({
-                "id": f"activity_{i+1}",
-                "name": f"Activity {i+1}",
-                "type": "Run" if i % 2 == 0 else "Ride",
-                "distance": 5.0 + i,
-                "start_date": f"2024-01-{15-i}T07:30:00Z"
-            })
-        
-        return json.dumps({"activities": activities})
+        activity_store.sync_if_stale(create_strava_client(), ACTIVITY_STORE_SYNC_INTERVAL)
+        activities = activity_store.recent(limit=limit)
+        return to_compact_json({"activities": activities})
     except Exception as e:
         return json.dumps({"error": f"Failed to fetch recent activities: {str(e)}"})
 
-@tool
+@telemetry.traced("tool")
+def search_activities(
+    session_id: str,
+    sport_type: str = "",
+    since: str = "",
+    until: str = "",
+    commute: str = "",
+    min_distance_km: float = 0,
+    name_contains: str = "",
+    order_by: str = "start_date",
+    limit: int = 10,
+) -> str:
+    """Search the user's Strava activity history, e.g. "my longest ride this month" or "all my commutes".
+
+    Args:
+        session_id: The current session id
+        sport_type: Strava sport type such as Run, Ride, Walk (empty for any)
+        since: Only activities starting on or after this ISO date, e.g. 2024-01-01 (empty for no bound)
+        until: Only activities starting before this ISO date (empty for no bound)
+        commute: "true" or "false" to filter commutes (empty for either)
+        min_distance_km: Minimum distance in kilometres
+        name_contains: Text the activity name must contain
+        order_by: One of start_date, distance, moving_time, elevation (largest/newest first)
+        limit: Maximum number of activities to return
+    """
+    try:
+        def parse_date(value: str):
+            if not value:
+                return None
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        
+        activity_store.sync_if_stale(create_strava_client(), ACTIVITY_STORE_SYNC_INTERVAL)
+        activities = activity_store.find(
+            sport_type=sport_type or None,
+            since=parse_date(since),
+            until=parse_date(until),
+            commute={"true": True, "false": False}.get(commute.lower()),
+            min_distance=min_distance_km * 1000 if min_distance_km else None,
+            name_contains=name_contains or None,
+            order_by=order_by,
+            limit=limit,
+        )
+        return to_compact_json({"activities": activities})
+    except Exception as e:
+        return json.dumps({"error": f"Failed to search activities: {str(e)}"})
+
+@telemetry.traced("tool")
 def get_user_preferences(session_id: str) -> str:
     """Get user's preferences and settings"""
     try:
@@ -153,29 +274,348 @@ def get_user_preferences(session_id: str) -> str:
 # Create an AgentCore app
 app = BedrockAgentCoreApp()
 
-# Create a non-streaming Bedrock model
-bedrock_model = BedrockModel(
-    model_id="us.amazon.nova-lite-v1:0",
-    streaming=False,  # Disable streaming
-    region_name="us-west-2"  # Explicitly set region
+AGENT_TOOLS = [
+    get_activity_details,
+    get_activity_analytics,
+    generate_creative_names,
+    update_activity_name,
+    update_activity_privacy,
+    get_recent_activities,
+    search_activities,
+    get_user_preferences,
+]
+
+# Per-tool timeouts in seconds; stream analytics and history syncs can legitimately take longer
+TOOL_TIMEOUT_SECONDS = float(os.getenv('TOOL_TIMEOUT_SECONDS', '10'))
+TOOL_TIMEOUTS = {
+    "get_activity_analytics": 20.0,
+    "get_recent_activities": 20.0,
+    "search_activities": 20.0,
+}
+
+# Shared pool for blocking tool calls so concurrent tool use across sessions stays bounded
+tool_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('TOOL_MAX_WORKERS', '16')), thread_name_prefix="tool"
+)
+
+NEW_ACTIVITY_MESSAGE = "Here are 3 creative name suggestions for your activity. Reply with 1, 2, or 3 to choose one, or tell me what you'd like to name it!"
+
+def recent_activity_titles(athlete_id=None) -> list:
+    """Titles of the athlete's most recent stored activities, so suggestions avoid repeats"""
+    return [summary["name"] for summary in activity_store.find(athlete_id=athlete_id, limit=30)]
+
+
+# The deterministic new-activity flow never touches Bedrock
+new_activity_pipeline = NewActivityPipeline(
+    create_strava_client,
+    recent_titles=recent_activity_titles,
+    analyze_streams=os.getenv('NEW_ACTIVITY_STREAM_ANALYSIS', 'true').lower() == 'true',
 )
 
-agent = Agent(
-    model=bedrock_model,
-    system_prompt=SYSTEM_PROMPT,
-    tools=[
-        get_activity_details,
-        generate_creative_names,
-        update_activity_name,
-        update_activity_privacy,
-        get_recent_activities,
-        get_user_preferences,
-    ],
+# Strava retries webhooks and sends bursts of events per activity; coalesce them
+webhook_deduplicator = WebhookDeduplicator(
+    create_idempotency_store(
+        backend=os.getenv('IDEMPOTENCY_BACKEND', 'memory'),
+        db_path=os.getenv('IDEMPOTENCY_DB_PATH'),
+    ),
+    window_seconds=float(os.getenv('IDEMPOTENCY_WINDOW_SECONDS', '300')),
+)
+
+# Remembers what each SMS session was last shown so replies like "2" resolve without the LLM
+session_store = create_session_store(
+    backend=os.getenv('SESSION_BACKEND', 'memory'),
+    db_path=os.getenv('SESSION_DB_PATH'),
+    max_size=int(os.getenv('SESSION_CACHE_SIZE', '1024')),
+    ttl_seconds=float(os.getenv('SESSION_TTL_SECONDS', '86400')),
+)
+
+# Each agent's history is capped by token budget, and a turn only sees the tools its message can need
+AGENT_HISTORY_TOKEN_BUDGET = int(os.getenv('AGENT_HISTORY_TOKEN_BUDGET', '3000'))
+AGENT_TOOL_RESULT_TOKEN_BUDGET = int(os.getenv('AGENT_TOOL_RESULT_TOKEN_BUDGET', '300'))
+AGENT_TOOL_SCOPING = os.getenv('AGENT_TOOL_SCOPING', 'true').lower() == 'true'
+
+_agent_components_cache = None
+_agent_lock = threading.Lock()
+# Estimated prompt tokens for each tool's spec, filled in when the tools are built
+tool_spec_token_counts: Dict[str, int] = {}
+
+
+def _agent_components():
+    """Build the Bedrock models and tool specs shared by every agent, once"""
+    global _agent_components_cache
+    if _agent_components_cache is None:
+        with _agent_lock:
+            if _agent_components_cache is None:
+                # strands is the heaviest import in the container, so defer it until needed
+                from strands import Agent, tool
+                from strands.models import BedrockModel
+                from strands.tools.executors import ConcurrentToolExecutor
+                
+                # Create a non-streaming Bedrock model
+                bedrock_model = BedrockModel(
+                    model_id="us.amazon.nova-lite-v1:0",
+                    streaming=False,  # Disable streaming
+                    region_name="us-west-2"  # Explicitly set region
+                )
+                # Same model over ConverseStream, for turns whose reply is streamed back
+                streaming_model = BedrockModel(
+                    model_id="us.amazon.nova-lite-v1:0",
+                    streaming=True,
+                    region_name="us-west-2"
+                )
+                tools = [
+                    tool(with_timeout(
+                        function,
+                        max(TOOL_TIMEOUTS.get(function.__name__, 0.0), TOOL_TIMEOUT_SECONDS),
+                        tool_executor,
+                    ))
+                    for function in AGENT_TOOLS
+                ]
+                tool_spec_token_counts.update(
+                    (agent_tool.tool_name, tool_spec_tokens(agent_tool.tool_spec)) for agent_tool in tools
+                )
+                _agent_components_cache = (Agent, ConcurrentToolExecutor, bedrock_model, streaming_model, tools)
+    return _agent_components_cache
+
+
+def build_agent() -> "Agent":
+    """Create an agent with its own conversation history, sharing the Bedrock model and tool specs"""
+    agent_class, executor_class, bedrock_model, _, tools = _agent_components()
+    from services.budget_conversation_manager import TokenBudgetConversationManager
+    
+    conversation_manager = TokenBudgetConversationManager(HistoryBudget(
+        max_tokens=AGENT_HISTORY_TOKEN_BUDGET, max_tool_result_tokens=AGENT_TOOL_RESULT_TOKEN_BUDGET,
+    ))
+    # Tool calls from one model turn run concurrently and their results keep the model's order
+    return agent_class(
+        model=bedrock_model,
+        system_prompt=SYSTEM_PROMPT,
+        tools=tools,
+        tool_executor=executor_class(),
+        conversation_manager=conversation_manager,
+    )
+
+
+@contextmanager
+def streaming_model(agent: "Agent"):
+    """Run one turn of a pooled agent over the streaming Bedrock API"""
+    default_model = agent.model
+    agent.model = _agent_components()[3]
+    try:
+        yield agent
+    finally:
+        agent.model = default_model
+
+
+@contextmanager
+def scoped_tools(agent: "Agent", tool_names: Optional[FrozenSet[str]]):
+    """Expose only `tool_names` to the model for one turn of a pooled agent (None exposes every tool)"""
+    registry = agent.tool_registry.registry
+    if tool_names is None:
+        yield agent
+        return
+    agent.tool_registry.registry = {name: tool for name, tool in registry.items() if name in tool_names}
+    try:
+        yield agent
+    finally:
+        agent.tool_registry.registry = registry
+
+
+def record_context(agent: "Agent") -> ContextEstimate:
+    """Estimate the prompt for the coming turn and what tool scoping and the history budget kept out of it"""
+    exposed = sum(tool_spec_token_counts.get(name, 0) for name in agent.tool_registry.registry)
+    estimate = ContextEstimate(
+        system=estimate_tokens(SYSTEM_PROMPT),
+        tools=exposed,
+        history=history_tokens(agent.messages),
+        tools_saved=sum(tool_spec_token_counts.values()) - exposed,
+        history_saved=agent.conversation_manager.budget.last_saved_tokens,
+    )
+    if telemetry.enabled:
+        for part in ("system", "tools", "history"):
+            telemetry.observe("context_tokens_per_turn", getattr(estimate, part), buckets=TOKEN_BUCKETS, part=part)
+        telemetry.count("context_tokens_saved_total", estimate.tools_saved, source="tools")
+        telemetry.count("context_tokens_saved_total", estimate.history_saved, source="history")
+    logger.debug("Agent context for this turn: %s", estimate)
+    return estimate
+
+
+# One agent per SMS session on a bounded executor, so conversations run in parallel without cross-talk
+agent_pool = AgentPool(
+    build_agent,
+    max_workers=int(os.getenv('AGENT_MAX_CONCURRENCY', '8')),
+    max_queued=int(os.getenv('AGENT_MAX_QUEUED', '16')),
+    max_sessions=int(os.getenv('AGENT_MAX_SESSIONS', '256')),
+    idle_ttl=float(os.getenv('AGENT_SESSION_IDLE_TTL', '1800')),
 )
 
+BUSY_MESSAGE = "I'm handling a lot of messages right now. Please try again in a minute."
+
+# Streamed replies: time to the first model token, the first SMS segment, and the whole reply
+stream_latency = {stage: LatencyHistogram() for stage in ("first_token", "first_segment", "completion")}
+
+
+def warm_up():
+    """Exercise parsing, projection and serialization once so the first request skips first-use costs"""
+    activity = MockStravaClient(lazy_parsing=client_registry.lazy_parsing).get_activity_details("0")
+    parse_activity(activity.model_dump_json(by_alias=True))
+    to_compact_json(project_activity(activity, "title"))
+
+
+PRIVACY_REPLIES = {
+    "public": "Done! Your activity is now public.",
+    "followers_only": "Done! Your activity is now visible to followers only.",
+    "private": "Done! Your activity is now private.",
+}
+
+# Share of SMS replies answered by the rule-based fast path, and latency of each path
+fast_path_stats = FastPathStats()
+
+
+def try_fast_path(session: SessionState, user_message: str) -> Optional[str]:
+    """Handle an unambiguous reply about the session's activity by calling the update tools directly.
+
+    Returns None when the message needs the LLM.
+    """
+    intent = parse_intent(user_message)
+    if intent is None:
+        return None
+    
+    if intent.action == CHOOSE:
+        name = session.choice(intent.value)
+        if name is None:
+            return None
+        result = json.loads(update_activity_name(session.activity_id, name, session.session_id))
+        reply = f"Done! Your activity is now named '{name}'."
+    elif intent.action == RENAME:
+        result = json.loads(update_activity_name(session.activity_id, intent.value, session.session_id))
+        reply = f"Done! Your activity is now named '{intent.value}'."
+    elif intent.action == SET_PRIVACY:
+        result = json.loads(update_activity_privacy(session.activity_id, intent.value, session.session_id))
+        reply = PRIVACY_REPLIES[intent.value]
+    else:
+        return None
+    
+    if "error" in result:
+        return f"Sorry, I couldn't update your activity: {result['error']}"
+    return reply
+
+
+def stream_segments(text: str) -> Iterator[str]:
+    """Yield a complete reply as SMS segments"""
+    yield from split_sms(text)
+
+
+def stream_agent_reply(
+    session_id: Optional[str], contextual_message: str, started: float, tool_names: Optional[FrozenSet[str]] = None
+) -> Iterator[str]:
+    """Run an agent turn over the streaming model, yielding each SMS segment as soon as it is complete"""
+    deltas: "queue.Queue" = queue.Queue()
+    done = object()
+    mutations = ActivityMutationBuffer(create_strava_client())
+    
+    def run_turn(agent):
+        async def forward_text():
+            async for event in agent.stream_async(contextual_message):
+                if "data" in event:
+                    deltas.put(event["data"])
+                elif "result" in event:
+                    record_agent_turn(event["result"])
+        
+        with mutations.turn(), streaming_model(agent), scoped_tools(agent, tool_names):
+            with telemetry.span("agent_turn", streaming=True):
+                record_context(agent)
+                asyncio.run(forward_text())
+    
+    try:
+        turn = agent_pool.submit(session_id, run_turn)
+    except AgentPoolSaturatedError:
+        logger.warning("Rejected prompt for session %s: %s", session_id, agent_pool.stats())
+        yield BUSY_MESSAGE
+        return
+    turn.add_done_callback(lambda _: deltas.put(done))
+    
+    chunker = SmsChunker()
+    first_token = first_segment = None
+    while (delta := deltas.get()) is not done:
+        if first_token is None:
+            first_token = time.perf_counter() - started
+            stream_latency["first_token"].record(first_token)
+        for segment in chunker.feed(delta):
+            if first_segment is None:
+                first_segment = time.perf_counter() - started
+                stream_latency["first_segment"].record(first_segment)
+            yield segment
+    
+    try:
+        turn.result()
+    except Exception as e:
+        yield from chunker.feed(f" Sorry, I encountered an error processing your request: {str(e)}")
+    flushed = mutations.flush()
+    activity_store.upsert_many(flushed.updated.values())
+    if flushed.errors:
+        yield from chunker.feed(" (Some changes could not be saved to Strava. Please try again.)")
+        logger.warning("Failed to flush activity updates: %s", flushed.errors)
+    yield from chunker.close()
+    
+    completion = time.perf_counter() - started
+    stream_latency["completion"].record(completion)
+    fast_path_stats.record("agent", completion)
+    logger.info(
+        "Streamed reply for session %s: first token %s ms, completion %.1f ms",
+        session_id, None if first_token is None else round(first_token * 1000, 1), completion * 1000,
+    )
+
+
+@app.ping
+def ping() -> PingStatus:
+    """Report busy while every agent worker is occupied so AgentCore routes new sessions elsewhere"""
+    return PingStatus.HEALTHY_BUSY if agent_pool.saturated else PingStatus.HEALTHY
+
+
+def record_agent_turn(result) -> None:
+    """Record LLM token usage and tool calls for one agent turn"""
+    if not telemetry.enabled:
+        return
+    invocation = result.metrics.latest_agent_invocation
+    if invocation is not None:
+        for direction in ("input", "output"):
+            tokens = invocation.usage.get(f"{direction}Tokens", 0)
+            telemetry.count("llm_tokens_total", tokens, direction=direction)
+            telemetry.observe("llm_tokens_per_turn", tokens, buckets=TOKEN_BUCKETS, direction=direction)
+        telemetry.observe("llm_cycles_per_turn", len(invocation.cycles), buckets=COUNT_BUCKETS)
+    trace = telemetry.current_trace()
+    if trace is not None:
+        telemetry.observe("tool_calls_per_turn", trace.counters.get("tool_calls_total", 0), buckets=COUNT_BUCKETS)
+
+
+async def metrics_endpoint(request) -> PlainTextResponse:
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(telemetry.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
 @app.entrypoint
 def invoke(payload):
     """Handler for agent invocation"""
+    labels = {"task": payload.get("task", "prompt")}
+    if payload.get("stream") and payload.get("prompt"):
+        # Streamed replies are produced after invoke returns, so the trace has to live inside the stream
+        return telemetry.request_stream(lambda: stream_invocation(payload), **labels)
+    with telemetry.request(**labels):
+        return handle_invocation(payload)
+
+
+def stream_invocation(payload) -> Iterator[str]:
+    """Run a streaming invocation, yielding its SMS segments"""
+    result = handle_invocation(payload)
+    if isinstance(result, str):
+        yield result
+    else:
+        yield from result
+
+
+def handle_invocation(payload):
+    """Route a payload to the deterministic workflow or the conversational agent"""
     
     # Check if this is a deterministic workflow (new activity trigger)
     if payload.get("task") == "start_new_activity_flow":
@@ -185,24 +625,36 @@ def invoke(payload):
         if not activity_id or not session_id:
             return json.dumps({"error": "Missing required parameters: activityId and sessionId"})
         
-        try:
-            # Execute deterministic workflow
-            # 1. Get activity details
-            activity_details = get_activity_details(activity_id, session_id)
-            
-            # 2. Generate creative names
-            creative_names_result = generate_creative_names(activity_details)
-            creative_names_data = json.loads(creative_names_result)
-            
-            if "error" in creative_names_data:
-                return json.dumps(creative_names_data)
+        def run_new_activity_flow() -> str:
+            # Execute deterministic workflow (webhook work yields quota to interactive SMS replies)
+            with default_rate_limiter.priority(RequestPriority.BACKGROUND):
+                result = new_activity_pipeline.run(activity_id, voice=payload.get("voice"))
+            for stage, ms in result.timings_ms.items():
+                telemetry.observe("pipeline_stage_duration_seconds", ms / 1000, stage=stage)
+            session_store.put(SessionState(
+                session_id=session_id,
+                activity_id=activity_id,
+                creative_names=result.creative_names,
+                athlete_id=payload.get("athleteId"),
+            ))
             
             # Return the generated names for sending to user
             return json.dumps({
                 "activity_id": activity_id,
-                "creative_names": creative_names_data["creative_names"],
-                "message": "Here are 3 creative name suggestions for your activity. Reply with 1, 2, or 3 to choose one, or tell me what you'd like to name it!"
+                "creative_names": result.creative_names,
+                "message": NEW_ACTIVITY_MESSAGE,
+                "timings_ms": result.timings_ms
             })
+        
+        try:
+            idempotency_key = WebhookDeduplicator.make_key(
+                payload.get("athleteId", ""), activity_id, payload.get("eventType", "create")
+            )
+            response, duplicate = webhook_deduplicator.run(idempotency_key, run_new_activity_flow)
+            if duplicate:
+                # Flag replays so the caller doesn't send the same SMS again
+                return json.dumps({**json.loads(response), "duplicate": True})
+            return response
             
         except Exception as e:
             return json.dumps({"error": f"Failed to process new activity: {str(e)}"})
@@ -215,15 +667,59 @@ def invoke(payload):
         if not user_message:
             return "No prompt found in input, please provide a message."
         
+        # Opt-in: stream the reply back as SMS-sized segments while it is generated
+        stream = bool(payload.get("stream"))
+        started = time.perf_counter()
+        session = session_store.get(session_id) if session_id else None
+        if session is not None:
+            # Suggestion picks, privacy changes and renames are most replies; handle them without the LLM
+            fast_reply = try_fast_path(session, user_message)
+            if fast_reply is not None:
+                fast_path_stats.record("fast_path", time.perf_counter() - started)
+                telemetry.annotate(path="fast_path")
+                return stream_segments(fast_reply) if stream else fast_reply
+        
         # Add session context to the user message if available
-        if session_id:
+        if session is not None:
+            suggestions = " | ".join(f"{i}. {name}" for i, name in enumerate(session.creative_names, 1))
+            contextual_message = (
+                f"[Session: {session_id}] [Activity: {session.activity_id}] "
+                f"[Suggested names: {suggestions}] {user_message}"
+            )
+        elif session_id:
             contextual_message = f"[Session: {session_id}] {user_message}"
         else:
             contextual_message = user_message
         
+        telemetry.annotate(path="stream" if stream else "agent")
+        tool_names = select_tools(user_message) if AGENT_TOOL_SCOPING else None
+        if stream:
+            return stream_agent_reply(session_id, contextual_message, started, tool_names)
+        
         try:
-            response = agent(contextual_message)
-            return response.message["content"][0]["text"]
+            # Writes requested during this turn are merged into one PUT per activity
+            mutations = ActivityMutationBuffer(create_strava_client())
+            
+            def run_turn(agent):
+                with mutations.turn(), scoped_tools(agent, tool_names), telemetry.span("agent_turn"):
+                    record_context(agent)
+                    result = agent(contextual_message)
+                record_agent_turn(result)
+                return result
+            
+            response = agent_pool.run(session_id, run_turn)
+            flushed = mutations.flush()
+            activity_store.upsert_many(flushed.updated.values())
+            
+            reply = response.message["content"][0]["text"]
+            if flushed.errors:
+                reply += " (Some changes could not be saved to Strava. Please try again.)"
+                logger.warning("Failed to flush activity updates: %s", flushed.errors)
+            fast_path_stats.record("agent", time.perf_counter() - started)
+            return reply
+        except AgentPoolSaturatedError:
+            logger.warning("Rejected prompt for session %s: %s", session_id, agent_pool.stats())
+            return BUSY_MESSAGE
         except Exception as e:
             return f"Sorry, I encountered an error processing your request: {str(e)}"
     
@@ -232,5 +728,18 @@ def invoke(payload):
             "error": "Invalid payload structure. Expected either 'task' for deterministic workflow or 'prompt' for conversational workflow."
         })
 
+if telemetry.enabled:
+    # Strava quota headroom and scheduler counters, read at scrape time
+    telemetry.add_gauges("strava_rate_limit", default_rate_limiter.headroom)
+    app.router.routes.append(Route("/metrics", metrics_endpoint, methods=["GET"]))
+
+# Deferred mode (default) keeps imports light and warms up off the request path;
+# eager mode pays everything at import for predictable first-request latency
+if os.getenv('AGENT_DEFERRED_INIT', 'true').lower() == 'true':
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+else:
+    warm_up()
+    build_agent()
+
 if __name__ == "__main__":
     app.run()
\ No newline at end of file
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Local Strava API simulator for exercising the real StravaClient offline.
+
+Serves the v3 endpoints the agent uses from fixtures or generated data,
+over real HTTP, with configurable latency, rate limiting (429s with
+X-RateLimit-* headers), bursts of 5xx errors and slow response bodies:
+
+    GET  /api/v3/activities/{id}
+    PUT  /api/v3/activities/{id}
+    GET  /api/v3/activities/{id}/streams
+    GET  /api/v3/athlete/activities
+
+Point a client at it with base_url="http://127.0.0.1:<port>/api/v3".
+GET /_simulator/stats reports what was served and POST /_simulator/reset
+clears counters and rate-limit usage.
+
+Usage:
+    python src/strava_simulator.py --port 8765 --latency lognormal --latency-ms 80 \\
+        --short-limit 100 --error-rate 0.02 --error-burst 3 --slow-body-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from clients.strava_client import MockStravaClient
+from telemetry import endpoint_template
+
+API_PREFIX = "/api/v3"
+UNLIMITED = 1_000_000
+
+_ACTIVITY_PATH = re.compile(r"^/activities/(\d+)$")
+_STREAMS_PATH = re.compile(r"^/activities/(\d+)/streams$")
+
+
+@dataclass
+class SimulatorConfig:
+    """Latency and fault-injection settings"""
+    # none, fixed, uniform or lognormal; latency_ms is the fixed value, mean or median
+    latency: str = "none"
+    latency_ms: float = 50.0
+    # Relative spread: uniform half-width as a fraction of latency_ms (0.5 -> +/-50%), lognormal sigma
+    latency_spread: float = 0.5
+    # Strava-style limits per 15-minute window and per day; 0 disables the limit
+    short_limit: int = 200
+    daily_limit: int = 2000
+    short_window_seconds: float = 900.0
+    # Extra 429s injected at random, independent of usage
+    rate_limit_rate: float = 0.0
+    # Probability that a request starts a burst of `error_burst` consecutive 5xx responses
+    error_rate: float = 0.0
+    error_burst: int = 3
+    # Probability that a body is dribbled out at slow_body_bytes_per_second
+    slow_body_rate: float = 0.0
+    slow_body_bytes_per_second: int = 20_000
+    seed: int = 0
+
+
+class RateLimitWindow:
+    """Tracks usage against Strava's short-term and daily limits"""
+    
+    def __init__(self, short_limit: int, daily_limit: int, short_window_seconds: float):
+        self.short_limit = short_limit
+        self.daily_limit = daily_limit
+        self.short_window_seconds = short_window_seconds
+        self.reset()
+    
+    def reset(self):
+        self.short_usage = 0
+        self.daily_usage = 0
+        self.short_started = time.monotonic()
+        self.daily_started = time.monotonic()
+    
+    def consume(self) -> bool:
+        """Count one request; False if it exceeds a limit"""
+        now = time.monotonic()
+        if now - self.short_started >= self.short_window_seconds:
+            self.short_usage, self.short_started = 0, now
+        if now - self.daily_started >= 86400:
+            self.daily_usage, self.daily_started = 0, now
+        
+        # Like Strava, rejected requests still count towards usage
+        self.short_usage += 1
+        self.daily_usage += 1
+        over_short = self.short_limit and self.short_usage > self.short_limit
+        over_daily = self.daily_limit and self.daily_usage > self.daily_limit
+        return not (over_short or over_daily)
+    
+    def headers(self) -> Dict[str, str]:
+        # Strava always sends both limits; report a disabled one as effectively unlimited
+        return {
+            "X-RateLimit-Limit": f"{self.short_limit or UNLIMITED},{self.daily_limit or UNLIMITED}",
+            "X-RateLimit-Usage": f"{self.short_usage},{self.daily_usage}",
+        }
+
+
+class StravaSimulator:
+    """Threaded HTTP server that impersonates the parts of the Strava API the agent calls"""
+    
+    def __init__(
+        self,
+        config: Optional[SimulatorConfig] = None,
+        data: Optional[MockStravaClient] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.config = config or SimulatorConfig()
+        self.data = data or MockStravaClient()
+        self.random = random.Random(self.config.seed)
+        self.rate_limits = RateLimitWindow(
+            self.config.short_limit, self.config.daily_limit, self.config.short_window_seconds
+        )
+        self._lock = threading.Lock()
+        self._burst_remaining = 0
+        self.stats: Dict[str, Any] = {}
+        self.reset()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+    
+    def start(self) -> "StravaSimulator":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="strava-simulator", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def __enter__(self) -> "StravaSimulator":
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def reset(self):
+        with self._lock:
+            self.rate_limits.reset()
+            self._burst_remaining = 0
+            self.stats = {"requests": 0, "by_status": {}, "by_endpoint": {}, "injected": {
+                "rate_limited": 0, "server_errors": 0, "slow_bodies": 0,
+            }}
+    
+    def _latency(self) -> float:
+        """Sample a response delay in seconds"""
+        config = self.config
+        if config.latency == "fixed":
+            delay = config.latency_ms
+        elif config.latency == "uniform":
+            half_width = config.latency_ms * config.latency_spread
+            delay = self.random.uniform(config.latency_ms - half_width, config.latency_ms + half_width)
+        elif config.latency == "lognormal":
+            delay = self.random.lognormvariate(0, config.latency_spread) * config.latency_ms
+        else:
+            return 0.0
+        return max(delay, 0.0) / 1000
+    
+    def _fault(self) -> Tuple[Optional[int], Dict[str, str], bool]:
+        """Decide this request's injected status (if any), rate-limit headers and whether its body is slow"""
+        config = self.config
+        with self._lock:
+            within_limits = self.rate_limits.consume()
+            headers = self.rate_limits.headers()
+            slow = self.random.random() < config.slow_body_rate
+            
+            if not within_limits or self.random.random() < config.rate_limit_rate:
+                self.stats["injected"]["rate_limited"] += 1
+                return 429, headers, False
+            if self._burst_remaining == 0 and self.random.random() < config.error_rate:
+                self._burst_remaining = config.error_burst
+            if self._burst_remaining:
+                self._burst_remaining -= 1
+                self.stats["injected"]["server_errors"] += 1
+                return self.random.choice((500, 502, 503)), headers, False
+            if slow:
+                self.stats["injected"]["slow_bodies"] += 1
+            return None, headers, slow
+    
+    def _record(self, endpoint: str, status: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            by_status = self.stats["by_status"]
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+            by_endpoint = self.stats["by_endpoint"]
+            by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + 1
+    
+    def route(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[str, int, bytes]:
+        """Serve one API call from the backing data, returning (endpoint, status, body)"""
+        match = _STREAMS_PATH.match(path)
+        if match and method == "GET":
+            keys = query.get("keys", "").split(",") if query.get("keys") else None
+            streams = self.data.get_activity_streams(match.group(1), keys)
+            payload = {
+                key: {"data": values.tolist(), "series_type": "distance", "original_size": int(values.size), "resolution": "high"}
+                for key, values in vars(streams).items() if values is not None
+            }
+            return "/activities/{id}/streams", 200, json.dumps(payload).encode()
+        
+        match = _ACTIVITY_PATH.match(path)
+        if match and method == "GET":
+            activity = self.data.get_activity_details(match.group(1))
+            return "/activities/{id}", 200, activity.model_dump_json(by_alias=True).encode()
+        if match and method == "PUT":
+            activity = self.data.update_activity(match.group(1), json.loads(body or b"{}"))
+            return "/activities/{id}", 200, activity.model_dump_json(by_alias=True).encode()
+        
+        if path == "/athlete/activities" and method == "GET":
+            activities = self.data.list_athlete_activities(
+                after=int(query["after"]) if "after" in query else None,
+                before=int(query["before"]) if "before" in query else None,
+                page=int(query.get("page", 1)),
+                per_page=int(query.get("per_page", 30)),
+            )
+            payload = "[" + ",".join(activity.model_dump_json(by_alias=True) for activity in activities) + "]"
+            return "/athlete/activities", 200, payload.encode()
+        
+        return path, 404, json.dumps({"message": "Record Not Found", "errors": []}).encode()
+    
+    def _handler_class(self):
+        simulator = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+            # Headers and body go out in separate writes; without TCP_NODELAY, Nagle plus delayed ACK
+            # adds ~40 ms to every response and swamps the simulated latency
+            disable_nagle_algorithm = True
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                self._handle("GET")
+            
+            def do_PUT(self):
+                self._handle("PUT")
+            
+            def do_POST(self):
+                self._handle("POST")
+            
+            def _handle(self, method: str):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                
+                if url.path == "/_simulator/stats":
+                    return self._send(200, json.dumps({**simulator.stats, "config": asdict(simulator.config)}).encode(), {})
+                if url.path == "/_simulator/reset" and method == "POST":
+                    simulator.reset()
+                    return self._send(204, b"", {})
+                
+                path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+                endpoint = endpoint_template(path)
+                time.sleep(simulator._latency())
+                status, headers, slow = simulator._fault()
+                if status is not None:
+                    message = "Rate Limit Exceeded" if status == 429 else "Server Error"
+                    simulator._record(endpoint, status)
+                    return self._send(status, json.dumps({"message": message, "errors": []}).encode(), headers)
+                
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    endpoint, status, payload = simulator.route(method, path, query, body)
+                except Exception as e:
+                    status, payload = 500, json.dumps({"message": str(e), "errors": []}).encode()
+                simulator._record(endpoint, status)
+                self._send(status, payload, headers, slow)
+            
+            def _send(self, status: int, payload: bytes, headers: Dict[str, str], slow: bool = False):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not slow:
+                    self.wfile.write(payload)
+                    return
+                # Dribble the body out in 10 chunks per second at the configured rate
+                chunk = max(simulator.config.slow_body_bytes_per_second // 10, 1)
+                for start in range(0, len(payload), chunk):
+                    self.wfile.write(payload[start:start + chunk])
+                    self.wfile.flush()
+                    time.sleep(0.1)
+        
+        return Handler
+
+
+def main():
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="Serve a local Strava API with latency and fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["none", "fixed", "uniform", "lognormal"], default=defaults.latency)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="fixed delay, uniform mean or lognormal median")
+    parser.add_argument("--latency-spread", type=float, default=defaults.latency_spread, help="relative spread: uniform half-width as a fraction of --latency-ms, or lognormal sigma")
+    parser.add_argument("--short-limit", type=int, default=defaults.short_limit, help="requests per 15 minutes (0 = unlimited)")
+    parser.add_argument("--daily-limit", type=int, default=defaults.daily_limit, help="requests per day (0 = unlimited)")
+    parser.add_argument("--short-window", type=float, default=defaults.short_window_seconds, help="short limit window in seconds")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="probability of a random 429")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="probability a request starts a 5xx burst")
+    parser.add_argument("--error-burst", type=int, default=defaults.error_burst, help="consecutive 5xx responses per burst")
+    parser.add_argument("--slow-body-rate", type=float, default=defaults.slow_body_rate, help="probability of a slow body")
+    parser.add_argument("--slow-body-bps", type=int, default=defaults.slow_body_bytes_per_second, help="slow body bytes per second")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_spread=args.latency_spread,
+        short_limit=args.short_limit,
+        daily_limit=args.daily_limit,
+        short_window_seconds=args.short_window,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        error_burst=args.error_burst,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_bytes_per_second=args.slow_body_bps,
+        seed=args.seed,
+    )
+    simulator = StravaSimulator(config, host=args.host, port=args.port)
+    print(f"Strava simulator listening on {simulator.base_url}")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
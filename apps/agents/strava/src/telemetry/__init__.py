@@ -0,0 +1,20 @@
+# Telemetry package
+from .metrics import (
+    COUNT_BUCKETS,
+    TOKEN_BUCKETS,
+    Histogram,
+    RequestTrace,
+    Telemetry,
+    endpoint_template,
+    telemetry
+)
+
+__all__ = [
+    "COUNT_BUCKETS",
+    "TOKEN_BUCKETS",
+    "Histogram",
+    "RequestTrace",
+    "Telemetry",
+    "endpoint_template",
+    "telemetry"
+]
@@ -0,0 +1,317 @@
+import functools
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, Prometheus-style; covers sub-ms parsing up to slow LLM turns
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# For per-request quantities such as tool calls or tokens
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_ID_SEGMENT = re.compile(r"/\d+")
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse ids in an API path so metrics group by endpoint, e.g. /activities/{id}/streams"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum and count, as exported to Prometheus"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket that contains it"""
+        if not self.count:
+            return None
+        target, running = q * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+@dataclass
+class RequestTrace:
+    """Per-invocation breakdown: time spent per span name, counters and labels"""
+    labels: Dict[str, str] = field(default_factory=dict)
+    span_seconds: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            self.span_seconds[name] = self.span_seconds.get(name, 0.0) + seconds
+    
+    def add_count(self, name: str, value: float):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("metamatic_request_trace", default=None)
+
+
+class _NullSpan:
+    """Stand-in returned while telemetry is disabled, so hot paths pay almost nothing"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def set(self, **labels):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times a block and records it into its histogram and the current request trace"""
+    
+    __slots__ = ("telemetry", "name", "labels", "start")
+    
+    def __init__(self, telemetry: "Telemetry", name: str, labels: Dict[str, str]):
+        self.telemetry = telemetry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        self.telemetry.observe(f"{self.name}_duration_seconds", elapsed, **self.labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            detail = self.labels.get("tool") or self.labels.get("endpoint")
+            trace.add_span(f"{self.name}:{detail}" if detail else self.name, elapsed)
+        return False
+    
+    def set(self, **labels):
+        """Attach labels known only after the block starts, e.g. an HTTP status"""
+        self.labels.update({key: str(value) for key, value in labels.items()})
+
+
+class Telemetry:
+    """In-process spans, counters and histograms for the agent's hot paths.
+
+    Disabled by default; while disabled, span() returns a shared no-op and
+    traced functions call straight through, so instrumented code costs one
+    attribute check. When enabled, each invocation also gets a RequestTrace
+    that is logged as one line when the request finishes.
+    """
+    
+    def __init__(self, enabled: bool = False, namespace: str = "metamatic"):
+        self.enabled = enabled
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauge_sources: Dict[str, Callable[[], Dict[str, float]]] = {}
+    
+    def add_gauges(self, prefix: str, collect: Callable[[], Dict[str, float]]):
+        """Export a component's current state, e.g. rate-limit headroom, as `<prefix>_<field>` gauges read at scrape time"""
+        with self._lock:
+            self._gauge_sources[prefix] = collect
+    
+    def gauges(self) -> Dict[str, float]:
+        with self._lock:
+            sources = list(self._gauge_sources.items())
+        # Collected outside the lock: sources take their own locks
+        return {
+            f"{prefix}_{field}": float(value)
+            for prefix, collect in sources
+            for field, value in collect().items()
+        }
+    
+    def span(self, name: str, **labels):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, {key: str(value) for key, value in labels.items()})
+    
+    def traced(self, name: str, **labels) -> Callable:
+        """Decorator that runs a function inside a span; the function's name is added as the `tool` label"""
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                self.count(f"{name}_calls_total", tool=function.__name__, **labels)
+                with self.span(name, tool=function.__name__, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def count(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, self._label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_count(name, value)
+    
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, self._label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+    
+    def current_trace(self) -> Optional[RequestTrace]:
+        return _current_trace.get()
+    
+    def annotate(self, **labels):
+        """Label the current request, e.g. with the path it took"""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.labels.update({key: str(value) for key, value in labels.items()})
+    
+    @contextmanager
+    def request(self, **labels) -> Iterator[Optional[RequestTrace]]:
+        """Root span for one invocation; collects a per-request breakdown and logs it"""
+        if not self.enabled:
+            yield None
+            return
+        trace = RequestTrace(labels={key: str(value) for key, value in labels.items()})
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_trace.reset(token)
+            self.observe("invoke_duration_seconds", elapsed, **trace.labels)
+            breakdown = {name: round(seconds * 1000, 3) for name, seconds in trace.span_seconds.items()}
+            logger.info(
+                "invoke %s took %.3f ms: spans_ms=%s counters=%s",
+                trace.labels, elapsed * 1000, breakdown, trace.counters,
+            )
+    
+    def request_stream(self, produce: Callable[[], Iterable], **labels) -> Iterator:
+        """Like request(), for a streamed response: the trace stays open until the stream is consumed.
+        
+        The caller consumes the stream after the handler has returned, one
+        step at a time and possibly on different threads, so every step runs
+        in one dedicated context that holds the trace.
+        """
+        if not self.enabled:
+            yield from produce()
+            return
+        context = copy_context()
+        request = self.request(**labels)
+        context.run(request.__enter__)
+        exc_info = (None, None, None)
+        try:
+            iterator = context.run(lambda: iter(produce()))
+            while True:
+                try:
+                    item = context.run(next, iterator)
+                except StopIteration:
+                    break
+                yield item
+        except BaseException as e:
+            exc_info = (type(e), e, e.__traceback__)
+            raise
+        finally:
+            context.run(request.__exit__, *exc_info)
+    
+    def snapshot(self) -> Dict[str, object]:
+        """Aggregated counters and histogram summaries, for in-process inspection"""
+        with self._lock:
+            counters = {self._series(name, labels): value for (name, labels), value in self._counters.items()}
+            histograms = {
+                self._series(name, labels): {
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for (name, labels), histogram in self._histograms.items()
+            }
+        return {"counters": counters, "gauges": self.gauges(), "histograms": histograms}
+    
+    def prometheus_text(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for name, value in sorted(self.gauges().items()):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for (series, labels), value in self._counters.items():
+                    if series == name:
+                        lines.append(f"{metric}{self._format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (series, labels), histogram in self._histograms.items():
+                    if series != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{metric}_bucket{self._format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{self._format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    @staticmethod
+    def _label_key(labels: Dict[str, object]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+    
+    @staticmethod
+    def _format_labels(labels: LabelKey) -> str:
+        if not labels:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+    
+    def _series(self, name: str, labels: LabelKey) -> str:
+        return f"{name}{self._format_labels(labels)}"
+
+
+# Process-wide instance; the entrypoint enables it from configuration
+telemetry = Telemetry()
@@ -0,0 +1,4 @@
+# Workflows package
+from .new_activity import NewActivityPipeline, NewActivityResult
+
+__all__ = ["NewActivityPipeline", "NewActivityResult"]
@@ -0,0 +1,101 @@
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from clients.strava_client import StravaClientInterface
+from models.strava_models import StravaActivityBase
+from models.activity_projection import project_activity
+from services.naming import suggest_creative_names
+from services.title_engine import FOOT_SPORTS
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed_stage(timings: Dict[str, float], stage: str):
+    """Record the wall-clock duration of a pipeline stage in milliseconds"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 3)
+
+
+@dataclass
+class NewActivityResult:
+    """Output of the new-activity pipeline"""
+    activity: StravaActivityBase
+    creative_names: List[str]
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
+class NewActivityPipeline:
+    """In-process pipeline for the new-activity webhook flow.
+
+    Stages pass the parsed activity object directly to each other, with no
+    tool wrappers, LLM, or JSON round-trips in between. With
+    `analyze_streams`, runs and walks also get a split analysis of their
+    time/distance streams, which unlocks the negative-split titles.
+    """
+    
+    def __init__(
+        self,
+        client_factory: Callable[[], StravaClientInterface],
+        recent_titles: Optional[Callable[[Optional[int]], List[str]]] = None,
+        analyze_streams: bool = False,
+    ):
+        self.client_factory = client_factory
+        # Looks up an athlete's recent titles so suggestions don't repeat them
+        self.recent_titles = recent_titles
+        self.analyze_streams = analyze_streams
+    
+    def fetch(self, activity_id: str) -> StravaActivityBase:
+        """Stage 1: load the activity"""
+        return self.client_factory().get_activity_details(activity_id)
+    
+    def analyze(self, activity: StravaActivityBase) -> Optional[Dict[str, Any]]:
+        """Stage 2: per-km split analysis from the streams, or None if unavailable"""
+        if (activity.sport_type or activity.type).lower() not in FOOT_SPORTS:
+            return None
+        # Imported here so numpy stays off the cold-start path
+        from analytics.streams import split_analysis
+        try:
+            streams = self.client_factory().get_activity_streams(str(activity.id), keys=("time", "distance"))
+        except Exception as e:
+            # Titles don't need streams; name the activity without them
+            logger.warning("No streams for activity %s: %s", activity.id, e)
+            return None
+        if streams.distance is None or streams.distance.size != streams.time.size:
+            return None
+        return split_analysis(streams.distance, streams.time)
+    
+    def generate_names(
+        self, activity: StravaActivityBase, voice: Optional[str] = None, splits: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """Stage 3: suggest titles from the title projection and any split analysis"""
+        recent = []
+        if self.recent_titles:
+            athlete_id = activity.athlete.id if activity.athlete else None
+            recent = self.recent_titles(athlete_id)
+        details = project_activity(activity, "title")
+        if splits:
+            details = {**details, "splits": splits}
+        return suggest_creative_names(details, voice=voice, recent_titles=recent)
+    
+    def run(self, activity_id: str, voice: Optional[str] = None) -> NewActivityResult:
+        """Run every stage, timing each one"""
+        timings: Dict[str, float] = {}
+        with _timed_stage(timings, "total"):
+            with _timed_stage(timings, "fetch"):
+                activity = self.fetch(activity_id)
+            splits = None
+            if self.analyze_streams:
+                with _timed_stage(timings, "analyze_streams"):
+                    splits = self.analyze(activity)
+            with _timed_stage(timings, "generate_names"):
+                creative_names = self.generate_names(activity, voice, splits)
+        
+        logger.info("New activity pipeline for %s took %s ms", activity_id, timings)
+        return NewActivityResult(activity=activity, creative_names=creative_names, timings_ms=timings)
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
 
+import argparse
+import http.client
 import json
 import os
+import queue
+import random
 import sys
+import threading
 import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "packages" / "py" / "agent_utils"))
+
+from agent_utils.stats import percentile  # noqa: E402
 
 AGENT_URL = os.getenv('AGENT_URL', 'http://localhost:8080/invocations')
 
@@ -145,6 +157,222 @@ def interactive_mode():
         except Exception as e:
             print(f'❌ Error: {e}')
 
+# ── Load mode ────────────────────────────────────────────────────────────────
+
+DEFAULT_MIX = "new-activity=6,reply=3,chat=1"
+CHAT_PROMPTS = [
+    "What were my recent activities?",
+    "What was my longest run this month?",
+    "Make it private",
+    "Rename it to Lunch Loop",
+]
+
+class PooledConnection:
+    """One keep-alive HTTP connection to the agent, reopened after errors"""
+    
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        self.connection = None
+    
+    def post(self, payload):
+        """POST a JSON payload, returning (status_code, body)"""
+        data = json.dumps(payload).encode('utf-8')
+        if self.connection is None:
+            self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        try:
+            self.connection.request('POST', self.path, body=data, headers={'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            return response.status, response.read().decode('utf-8', errors='replace')
+        except Exception:
+            self.close()
+            raise
+    
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+class PayloadGenerator:
+    """Produces a weighted mix of webhook, numeric-reply and chat payloads"""
+    
+    def __init__(self, mix, activity_ids, duplicate_rate, seed):
+        self.types = list(mix)
+        self.weights = [mix[t] for t in self.types]
+        self.activity_ids = activity_ids
+        self.duplicate_rate = duplicate_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sent_webhooks = []
+        self.counter = 0
+    
+    def next(self):
+        with self.lock:
+            self.counter += 1
+            payload_type = self.random.choices(self.types, self.weights)[0]
+            
+            if payload_type == 'new-activity':
+                # Strava retries and bursts mean the same event often arrives more than once
+                if self.sent_webhooks and self.random.random() < self.duplicate_rate:
+                    return payload_type, dict(self.random.choice(self.sent_webhooks))
+                payload = {
+                    "task": "start_new_activity_flow",
+                    "activityId": self.random.choice(self.activity_ids),
+                    "athleteId": "load-athlete",
+                    "eventType": f"create-{self.counter}",
+                    "sessionId": f"load-{self.counter}"
+                }
+                self.sent_webhooks.append(payload)
+                return payload_type, payload
+            
+            if payload_type == 'reply':
+                # Reply to a suggestion list sent earlier in the run
+                session_id = self.random.choice(self.sent_webhooks)['sessionId'] if self.sent_webhooks else f"load-{self.counter}"
+                return payload_type, {"prompt": self.random.choice("123"), "sessionId": session_id}
+            
+            return payload_type, {"prompt": self.random.choice(CHAT_PROMPTS), "sessionId": f"load-chat-{self.counter}"}
+
+def is_error(status, body):
+    if status >= 400:
+        return True
+    try:
+        parsed = json.loads(body)
+    except json.JSONDecodeError:
+        return body.startswith('Sorry')
+    return isinstance(parsed, dict) and 'error' in parsed
+
+def summarize(samples, elapsed):
+    """Throughput, error rate and latency percentiles for a list of (latency_s, error) samples"""
+    latencies = sorted(round(latency * 1000, 3) for latency, _ in samples)
+    errors = sum(1 for _, error in samples if error)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None,
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else None,
+        },
+    }
+
+def run_load(args):
+    """Replay mixed payloads at a fixed rate (open loop) or fixed concurrency (closed loop)"""
+    mix = {}
+    for part in args.mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ('new-activity', 'reply', 'chat'):
+            raise ValueError(f"Unknown payload type '{name}'. Must be one of: new-activity, reply, chat")
+        mix[name] = float(weight or 1)
+    
+    generator = PayloadGenerator(mix, args.activity_ids.split(','), args.duplicate_rate, args.seed)
+    samples = {name: [] for name in mix}
+    samples_lock = threading.Lock()
+    work = queue.Queue(maxsize=args.concurrency * 4)
+    
+    def worker():
+        connection = PooledConnection(args.url, args.timeout)
+        while True:
+            scheduled = work.get()
+            if scheduled is None:
+                break
+            payload_type, payload = generator.next()
+            # In rate mode latency counts from the scheduled send time, so queueing behind slow requests shows up
+            start = scheduled or time.perf_counter()
+            try:
+                status, body = connection.post(payload)
+                error = is_error(status, body)
+            except Exception:
+                error = True
+            with samples_lock:
+                samples[payload_type].append((time.perf_counter() - start, error))
+        connection.close()
+    
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for thread in workers:
+        thread.start()
+    
+    print(f"🚀 Load test against {args.url}: "
+          f"{f'{args.rate} req/s' if args.rate else f'{args.concurrency} concurrent'} for {args.duration}s, mix {mix}")
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    sent = 0
+    try:
+        while time.perf_counter() < deadline and (not args.requests or sent < args.requests):
+            if args.rate:
+                scheduled = started + sent / args.rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                work.put(scheduled)
+            else:
+                work.put(0.0)
+            sent += 1
+    except KeyboardInterrupt:
+        # Still report whatever completed before the interrupt
+        pass
+    for _ in workers:
+        work.put(None)
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    all_samples = [sample for values in samples.values() for sample in values]
+    report = {
+        'started_at': started_at,
+        'config': {
+            'url': args.url,
+            'mode': 'rate' if args.rate else 'concurrency',
+            'rate': args.rate,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'mix': mix,
+            'duplicate_rate': args.duplicate_rate,
+            'seed': args.seed,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'totals': summarize(all_samples, elapsed),
+        'by_type': {name: summarize(values, elapsed) for name, values in samples.items()},
+    }
+    
+    print_separator('═', 78)
+    print(f"{'type':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print_separator('─', 78)
+    for name, stats in [*report['by_type'].items(), ('total', report['totals'])]:
+        latency = stats['latency_ms']
+        fmt = lambda value: f"{value:>10.1f}" if value is not None else f"{'-':>10}"
+        print(f"{name:<14}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput_rps']:>9.1f}"
+              f"{fmt(latency['p50'])}{fmt(latency['p95'])}{fmt(latency['p99'])}")
+    
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.out}")
+    return report
+
+def load_mode(argv):
+    parser = argparse.ArgumentParser(prog='test_client.py load', description='Replay mixed payloads against the agent and report latency')
+    parser.add_argument('--url', default=AGENT_URL, help='Agent invocations URL')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run for')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--rate', type=float, default=0, help='Target requests per second (0 = as fast as --concurrency allows)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Worker threads, each with one keep-alive connection')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted payload mix, e.g. new-activity=6,reply=3,chat=1')
+    parser.add_argument('--activity-ids', default='87654321,12345678,11223344', help='Comma-separated activity ids for webhooks')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Fraction of webhooks that replay an earlier event')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the payload sequence')
+    parser.add_argument('--out', help='Write the JSON report to this file')
+    run_load(parser.parse_args(argv))
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         test_type = sys.argv[1].lower()
@@ -152,8 +380,10 @@ if __name__ == "__main__":
             test_new_activity_flow()
         elif test_type == 'chat':
             test_chat_flow()
+        elif test_type == 'load':
+            load_mode(sys.argv[2:])
         else:
             print(f'❌ Unknown test type: {test_type}')
-            print('Available types: new-activity, chat')
+            print('Available types: new-activity, chat, load')
     else:
         interactive_mode()
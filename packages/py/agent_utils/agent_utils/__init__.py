@@ -1,2 +1,3 @@
 # Re-export commonly used utilities
 from .env_loader import initialize_env  # noqa: F401
+from .stats import percentile  # noqa: F401
@@ -1,25 +1,69 @@
-from dotenv import load_dotenv, find_dotenv
+from dotenv import load_dotenv
+from pathlib import Path
+from typing import Dict, Iterable, Optional
 import os
+import threading
 
-def initialize_env():
+_initialized = False
+_lock = threading.Lock()
+
+
+def _find_env_files(filenames: Iterable[str], start: Optional[str] = None) -> Dict[str, Path]:
+    """Find the nearest copy of each filename from the working directory upwards.
+
+    Equivalent to calling find_dotenv(name, usecwd=True) per file, but walks
+    the directory tree once for all of them.
+    """
+    wanted = list(filenames)
+    found: Dict[str, Path] = {}
+    directory = Path(start or os.getcwd()).resolve()
+    for candidate in (directory, *directory.parents):
+        for name in wanted:
+            if name not in found and (candidate / name).is_file():
+                found[name] = candidate / name
+        if len(found) == len(wanted):
+            break
+    return found
+
+
+def initialize_env(force: bool = False) -> bool:
     """Load layered .env files with sensible overrides.
 
     Order (first found wins unless override=True):
     - .env.shared, .env.backend (base)
     - .env.<ENV> (override)
     - .env (base), .env.local (override)
+
+    Runs once per process; later calls are no-ops unless force=True.
+    Returns True if the files were (re)loaded.
     """
+    global _initialized
+
+    with _lock:
+        if _initialized and not force:
+            return False
+
+        # ENV may itself come from .env.shared/.env.backend, so look for every
+        # stage file in the same walk and pick the right one afterwards
+        candidates = ['.env.shared', '.env.backend', '.env', '.env.local']
+        stage = os.getenv('ENV', 'development')
+        found = _find_env_files(candidates + [f'.env.{stage}'])
+
+        def load_layer(filename: str, override: bool = False) -> None:
+            path = found.get(filename)
+            if path is None and filename not in candidates:
+                path = _find_env_files([filename]).get(filename)
+            if path:
+                load_dotenv(path, override=override)
 
-    def load_layer(filename: str, override: bool = False) -> None:
-        path = find_dotenv(filename, usecwd=True)
-        if path:
-            load_dotenv(path, override=override)
+        load_layer('.env.shared', override=False)
+        load_layer('.env.backend', override=False)
 
-    load_layer('.env.shared', override=False)
-    load_layer('.env.backend', override=False)
+        stage = os.getenv('ENV', 'development')
+        load_layer(f'.env.{stage}', override=True)
 
-    stage = os.getenv('ENV', 'development')
-    load_layer(f'.env.{stage}', override=True)
+        load_layer('.env', override=False)
+        load_layer('.env.local', override=True)
 
-    load_layer('.env', override=False)
-    load_layer('.env.local', override=True)
+        _initialized = True
+        return True
@@ -0,0 +1,11 @@
+import math
+from typing import Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence; None if it is empty"""
+    if not sorted_values:
+        return None
+    # pct * n / 100 rather than pct / 100 * n, so e.g. p7 of 100 samples doesn't round up to rank 8
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100))
+    return sorted_values[rank - 1]